@@ -1,42 +1,127 @@
-import requests
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
 
 from django.conf import settings
+from django.utils import timezone
 
 from rest_framework.exceptions import APIException
 
+from common.http import google_client
+from common.logging import get_logger
 
-def refresh_access_token(user):
+
+logger = get_logger(__name__)
+
+TOKEN_EXPIRY_MARGIN = timedelta(seconds=60)
+RRULE_WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+
+def request_access_token(refresh_token):
     client_id = getattr(settings, 'GOOGLE_CLIENT_ID')
     client_secret = getattr(settings, 'GOOGLE_CLIENT_SECRET')
-    refresh_token = user.google_account.refresh_token
 
-    request_uri = ('https://oauth2.googleapis.com/token?'
+    oauth_url = getattr(settings, 'GOOGLE_OAUTH_URL')
+    request_uri = (oauth_url + '/token?'
                    'client_id=' + client_id + '&'
                    'client_secret=' + client_secret + '&'
                    'grant_type=refresh_token&'
                    'refresh_token=' + refresh_token
                    )
-    response = requests.post(request_uri)
+    response = google_client.post(request_uri)
     response_body = response.json()
 
     access_token = response_body['access_token']
-    user.google_account.access_token = access_token
-    user.save()
+    expires_at = timezone.now() + timedelta(seconds=response_body.get('expires_in', 0))
+
+    return access_token, expires_at
+
+
+def refresh_access_token(user):
+    account = user.google_account
+    account.access_token, account.access_token_expires_at = request_access_token(account.refresh_token)
+    account.save(update_fields=['access_token', 'access_token_expires_at'])
+    token_provider.store(account)
 
-    return access_token
+    return account.access_token
 
 
-def create_calendar_event(user, summary, start_datetime, end_datetime, location):
+class AccessTokenProvider:
     '''
-    summary(string): 이벤트의 제목
-    start_datetime(datetime): 이벤트 시작 시간 ex)2023-05-25T20:00:00+09:00
-    end_datetime(datetime): 이벤트 종료 시간 ex)2023-05-25T22:00:00+09:00
-    location(string): 이벤트의 지리적 위치
+    사용자별 구글 access token을 만료 시간까지 재사용
+    만료가 가까운 경우에만 갱신하며, 같은 사용자의 갱신 요청이 여러 thread에서 동시에 들어오면
+    한 thread만 갱신하고 나머지는 그 결과를 사용한다.
     '''
-    if not hasattr(user, 'google_account'):
-        raise APIException('this user did not sign in with google account.')
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__user_locks = {}
+        self.__tokens = {}
+
+    def __get_user_lock(self, user_id):
+        with self.__lock:
+            return self.__user_locks.setdefault(user_id, threading.Lock())
+
+    def __is_valid(self, access_token, expires_at):
+        return bool(access_token) and expires_at is not None and timezone.now() + TOKEN_EXPIRY_MARGIN < expires_at
+
+    def __get_valid_token(self, account):
+        access_token, expires_at = self.__tokens.get(account.user_id, (None, None))
+        if self.__is_valid(access_token, expires_at):
+            return access_token
+
+        if self.__is_valid(account.access_token, account.access_token_expires_at):
+            self.store(account)
+            return account.access_token
+
+        return None
+
+    def store(self, account):
+        self.__tokens[account.user_id] = (account.access_token, account.access_token_expires_at)
+
+    def invalidate(self, user_id):
+        self.__tokens.pop(user_id, None)
+
+    def get(self, user):
+        account = user.google_account
+        access_token = self.__get_valid_token(account)
+        if access_token:
+            return access_token
+
+        with self.__get_user_lock(account.user_id):
+            access_token = self.__get_valid_token(account)
+            if access_token:
+                return access_token
+
+            return refresh_access_token(user)
+
+
+token_provider = AccessTokenProvider()
+
+
+def get_access_token(user):
+    return token_provider.get(user)
+
+
+def get_recurrence(weekdays, until=None):
+    '''
+    weekdays(list): 반복 요일, date.weekday() 기준 ex)[0, 3] -> 월, 목
+    until(datetime): 반복 종료 시간(timezone 포함), 없으면 무기한 반복
+    return: ['RRULE:FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20230630T145959Z']
+    '''
+    rule = 'RRULE:FREQ=WEEKLY;BYDAY=' + ','.join(RRULE_WEEKDAYS[weekday] for weekday in sorted(weekdays))
+    if until is not None:
+        rule += ';UNTIL=' + to_utc_basic_format(until)
+
+    return [rule]
+
+
+def to_utc_basic_format(value):
+    # 2023-06-05T10:00:00+09:00 -> 20230605T010000Z
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
 
-    request_uri = 'https://www.googleapis.com/calendar/v3/calendars/primary/events'
+
+def get_event_body(summary, start_datetime, end_datetime, location, attendees=None, recurrence=None):
     body_data = {
         'summary': summary,
         'start': {
@@ -47,55 +132,96 @@ def create_calendar_event(user, summary, start_datetime, end_datetime, location)
         },
         'location': location,
     }
+    if attendees is not None:
+        body_data['attendees'] = [{'email': email} for email in attendees]
+    if recurrence:
+        # 반복 이벤트는 요일을 계산할 timezone이 필요
+        body_data['recurrence'] = recurrence
+        body_data['start']['timeZone'] = body_data['end']['timeZone'] = settings.TIME_ZONE
+
+    return body_data
+
+
+def get_send_updates_params(attendees):
+    # 참석자가 있는 이벤트는 생성, 변경, 취소 시 참석자들에게 초대 메일 발송
+    return {'sendUpdates': 'all'} if attendees else {}
+
+
+def create_calendar_event(user, summary, start_datetime, end_datetime, location, attendees=None, recurrence=None):
+    '''
+    summary(string): 이벤트의 제목
+    start_datetime(datetime): 이벤트 시작 시간 ex)2023-05-25T20:00:00+09:00
+    end_datetime(datetime): 이벤트 종료 시간 ex)2023-05-25T22:00:00+09:00
+    location(string): 이벤트의 지리적 위치
+    attendees(list): 이벤트에 초대할 참석자들의 이메일, 이벤트는 user의 캘린더에만 생성됨
+    recurrence(list): 반복 규칙(RRULE), get_recurrence 참고. 반복 예약 전체가 이벤트 하나로 생성됨
+    '''
+    if not hasattr(user, 'google_account'):
+        raise APIException('this user did not sign in with google account.')
 
-    access_token = refresh_access_token(user)
+    request_uri = getattr(settings, 'GOOGLE_CALENDAR_URL') + '/calendars/primary/events'
+    body_data = get_event_body(summary, start_datetime, end_datetime, location, attendees, recurrence)
+
+    access_token = get_access_token(user)
     headers = {'Authorization': f'Bearer {access_token}'}
-    response = requests.post(request_uri, headers=headers, json=body_data)
+    response = google_client.post(request_uri, headers=headers, json=body_data,
+                                  params=get_send_updates_params(attendees))
     
     return response
 
 
-def delete_calendar_event(user, event_id):
+def delete_calendar_event(user, event_id, notify_attendees=False):
     if not hasattr(user, 'google_account'):
         raise APIException('this user did not sign in with google account.')
 
-    request_uri = f'https://www.googleapis.com/calendar/v3/calendars/primary/events/{event_id}'
-    access_token = refresh_access_token(user)
+    request_uri = getattr(settings, 'GOOGLE_CALENDAR_URL') + f'/calendars/primary/events/{event_id}'
+    access_token = get_access_token(user)
     headers = {'Authorization': f'Bearer {access_token}'}
-    response = requests.delete(request_uri, headers=headers)
+    response = google_client.delete(request_uri, headers=headers, params=get_send_updates_params(notify_attendees))
 
     if response.status_code == 204:
-        print('success')
+        logger.debug('calendar_event_deleted', user=user.id, event_id=event_id)
     else:
-        print('fail')
-        print(response.json())
+        logger.warning('calendar_event_delete_failed', user=user.id, event_id=event_id,
+                       status=response.status_code, body=lambda: response.text)
 
     return response
 
-def update_calendar_event(user, event_id, summary, start_datetime, end_datetime, location):
+def update_calendar_event(user, event_id, summary, start_datetime, end_datetime, location, attendees=None,
+                          recurrence=None):
     if not hasattr(user, 'google_account'):
         raise APIException('this user did not sign in with google account.')
 
-    request_uri = f'https://www.googleapis.com/calendar/v3/calendars/primary/events/{event_id}'
-    body_data = {
-        'summary': summary,
-        'start': {
-            'dateTime': start_datetime,
-        },
-        'end': {
-            'dateTime': end_datetime,
-        },
-        'location': location,
-    }
+    request_uri = getattr(settings, 'GOOGLE_CALENDAR_URL') + f'/calendars/primary/events/{event_id}'
+    body_data = get_event_body(summary, start_datetime, end_datetime, location, attendees, recurrence)
 
-    access_token = refresh_access_token(user)
+    access_token = get_access_token(user)
     headers = {'Authorization': f'Bearer {access_token}'}
-    response = requests.put(request_uri, headers=headers, json=body_data)
+    response = google_client.put(request_uri, headers=headers, json=body_data,
+                                 params=get_send_updates_params(attendees))
 
     if response.status_code == 200:
-        print('success')
+        logger.debug('calendar_event_updated', user=user.id, event_id=event_id)
     else:
-        print('fail')
-        print(response.json())
+        logger.warning('calendar_event_update_failed', user=user.id, event_id=event_id,
+                       status=response.status_code, body=lambda: response.text)
+
+    return response
+
+
+def cancel_calendar_event_occurrence(user, event_id, original_start_datetime, notify_attendees=False):
+    '''
+    반복 이벤트 중 한 번의 일정만 취소, 해당 instance를 cancelled 상태로 override
+    original_start_datetime(datetime): 취소할 일정의 원래 시작 시간 ex)2023-06-05T10:00:00+09:00
+    '''
+    if not hasattr(user, 'google_account'):
+        raise APIException('this user did not sign in with google account.')
+
+    instance_id = f'{event_id}_{to_utc_basic_format(original_start_datetime)}'
+    request_uri = getattr(settings, 'GOOGLE_CALENDAR_URL') + f'/calendars/primary/events/{instance_id}'
+    access_token = get_access_token(user)
+    headers = {'Authorization': f'Bearer {access_token}'}
+    response = google_client.patch(request_uri, headers=headers, json={'status': 'cancelled'},
+                                   params=get_send_updates_params(notify_attendees))
 
     return response
@@ -0,0 +1,112 @@
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import override_settings
+
+
+class FakeGoogleHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def __respond(self, status, body=None):
+        data = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def __handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        url = urlsplit(self.path)
+        path = url.path
+        self.server.record(self.command, path, parse_qs(url.query), body, self.headers)
+
+        status = self.server.next_status()
+        if status is not None:
+            return self.__respond(status, {'error': {'code': status}})
+
+        if path == '/token':
+            return self.__respond(200, {'access_token': uuid.uuid4().hex, 'expires_in': 3599, 'token_type': 'Bearer'})
+        if path == '/revoke':
+            return self.__respond(200, {})
+        if path.startswith('/calendar/v3/calendars/primary/events'):
+            if self.command == 'DELETE':
+                return self.__respond(204)
+            event_id = uuid.uuid4().hex if self.command == 'POST' else path.rsplit('/', 1)[-1]
+            return self.__respond(200, {'id': event_id, **(body or {})})
+        return self.__respond(404, {'error': {'code': 404}})
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = __handle
+
+
+class FakeGoogleServer(ThreadingHTTPServer):
+    """
+    테스트용 구글 OAuth, Calendar API 서버
+    받은 요청을 requests에 기록하며, fail_next로 다음 응답들의 status code를 지정할 수 있다.
+    ex)
+    with FakeGoogleServer() as server:
+        with override_settings(**server.settings):
+            ...
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeGoogleHandler)
+        self.requests = []
+        self.__statuses = []
+        self.__lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def settings(self):
+        return {
+            'GOOGLE_OAUTH_URL': self.url,
+            'GOOGLE_CALENDAR_URL': self.url + '/calendar/v3',
+            'GOOGLE_CLIENT_ID': 'fake-client-id',
+            'GOOGLE_CLIENT_SECRET': 'fake-client-secret',
+        }
+
+    def record(self, method, path, query, body, headers):
+        with self.__lock:
+            self.requests.append({'method': method, 'path': path, 'query': query, 'body': body, 'headers': dict(headers)})
+
+    def fail_next(self, *statuses):
+        with self.__lock:
+            self.__statuses.extend(statuses)
+
+    def next_status(self):
+        with self.__lock:
+            return self.__statuses.pop(0) if self.__statuses else None
+
+    def requests_to(self, method, path_prefix):
+        return [request for request in self.requests if request['method'] == method and request['path'].startswith(path_prefix)]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeGoogleServerMixin:
+    """TestCase마다 FakeGoogleServer(self.server)를 띄우고 구글 API 설정을 그 서버로 바꾼다."""
+
+    def setUp(self):
+        super().setUp()
+        self.server = FakeGoogleServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        settings_override = override_settings(**self.server.settings)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
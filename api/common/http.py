@@ -0,0 +1,167 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.conf import settings
+
+from rest_framework.exceptions import APIException
+from rest_framework.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from common.instrumentation import timed_external
+
+
+class CircuitBreakerOpen(APIException):
+    status_code = HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'External service is temporarily unavailable.'
+    default_code = 'circuit_breaker_open'
+
+
+class CircuitBreaker:
+    '''
+    연속 실패가 failure_threshold번 쌓이면 open 상태가 되어 reset_timeout초 동안 요청을 바로 거절
+    이후 half-open 상태에서 요청 하나만 통과시켜 성공하면 closed, 실패하면 다시 open
+    '''
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.__lock = threading.Lock()
+        self.__state = self.CLOSED
+        self.__failures = 0
+        self.__opened_at = 0
+        self.__probing = False
+        self.counters = {
+            'requests': 0,
+            'failures': 0,
+            'rejected': 0,
+            'opened': 0,
+            'half_opened': 0,
+            'closed': 0,
+        }
+
+    def __update_state(self):
+        if self.__state == self.OPEN and time.monotonic() - self.__opened_at >= self.reset_timeout:
+            self.__state = self.HALF_OPEN
+            self.__probing = False
+            self.counters['half_opened'] += 1
+
+    def __open(self):
+        self.__state = self.OPEN
+        self.__opened_at = time.monotonic()
+        self.counters['opened'] += 1
+
+    @property
+    def state(self):
+        with self.__lock:
+            self.__update_state()
+            return self.__state
+
+    def before_request(self):
+        with self.__lock:
+            self.__update_state()
+            if self.__state == self.OPEN or (self.__state == self.HALF_OPEN and self.__probing):
+                self.counters['rejected'] += 1
+                raise CircuitBreakerOpen()
+
+            if self.__state == self.HALF_OPEN:
+                self.__probing = True
+            self.counters['requests'] += 1
+
+    def record_success(self):
+        with self.__lock:
+            if self.__state != self.CLOSED:
+                self.counters['closed'] += 1
+            self.__state = self.CLOSED
+            self.__failures = 0
+            self.__probing = False
+
+    def record_failure(self):
+        with self.__lock:
+            self.__failures += 1
+            self.counters['failures'] += 1
+            if self.__state == self.HALF_OPEN or self.__failures >= self.failure_threshold:
+                self.__open()
+            self.__probing = False
+
+    def release_probe(self):
+        with self.__lock:
+            self.__probing = False
+
+    def stats(self):
+        with self.__lock:
+            self.__update_state()
+            return {'state': self.__state, **self.counters}
+
+
+class HttpClient:
+    '''
+    keep-alive connection pool을 재사용하는 HTTP client
+    모든 요청에 connect/read timeout을 적용하고, 멱등 요청과 연결 실패만 제한된 횟수로 재시도한다.
+    5xx, 429 응답이나 연결 실패가 계속되면 circuit breaker가 이후 요청을 바로 거절한다.
+    '''
+    FAILURE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, timeout=(3.05, 10), retries=2, pool_maxsize=10, failure_threshold=5, reset_timeout=30, name='http'):
+        self.name = name
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.2,
+            status_forcelist=self.FAILURE_STATUS_CODES,
+            raise_on_status=False,
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        self.breaker.before_request()
+        try:
+            with timed_external(self.name):
+                response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        finally:
+            # 성공, 실패로 기록되지 않는 예외에도 half-open 상태의 시험 요청 자리를 돌려준다.
+            self.breaker.release_probe()
+
+        if response.status_code in self.FAILURE_STATUS_CODES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+
+google_client = HttpClient(
+    timeout=getattr(settings, 'GOOGLE_HTTP_TIMEOUT', (3.05, 10)),
+    retries=getattr(settings, 'GOOGLE_HTTP_RETRIES', 2),
+    pool_maxsize=getattr(settings, 'GOOGLE_HTTP_POOL_SIZE', 10),
+    failure_threshold=getattr(settings, 'GOOGLE_CIRCUIT_BREAKER_THRESHOLD', 5),
+    reset_timeout=getattr(settings, 'GOOGLE_CIRCUIT_BREAKER_RESET_TIMEOUT', 30),
+    name='google',
+)
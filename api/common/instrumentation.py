@@ -0,0 +1,116 @@
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from common.logging import get_logger
+
+
+logger = get_logger('common.instrumentation')
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """요청 하나에서 실행한 SQL과 외부 HTTP 호출 시간을 모은다."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.query_shapes = Counter()
+        self.external_seconds = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper로 등록되어 모든 query 실행을 감싼다.
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started_at
+            self.query_count += 1
+            # parameter는 placeholder로 분리되어 있으므로 sql 문자열이 곧 query 형태
+            self.query_shapes[sql] += 1
+
+    def get_duplicates(self):
+        return {sql: count for sql, count in self.query_shapes.items() if count > 1}
+
+    def get_elapsed(self):
+        return time.perf_counter() - self.started_at
+
+
+def record_external(service, seconds):
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.external_seconds[service] += seconds
+
+
+@contextmanager
+def timed_external(service):
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_external(service, time.perf_counter() - started_at)
+
+
+def to_ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    요청마다 query 수, DB 시간, 중복 query, 외부 HTTP 시간, 전체 처리 시간을
+    Server-Timing header와 log로 남긴다.
+    connection.queries 대신 execute wrapper를 사용하므로 DEBUG=False에서도 동작한다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+
+        self.report(request, response, metrics)
+        return response
+
+    def report(self, request, response, metrics):
+        elapsed = metrics.get_elapsed()
+        duplicates = metrics.get_duplicates()
+        external_seconds = sum(metrics.external_seconds.values())
+
+        timings = [
+            f'db;dur={to_ms(metrics.db_seconds)};desc="{metrics.query_count} queries"',
+            *(f'{service};dur={to_ms(seconds)}' for service, seconds in metrics.external_seconds.items()),
+            f'app;dur={to_ms(elapsed - metrics.db_seconds - external_seconds)}',
+            f'total;dur={to_ms(elapsed)}',
+        ]
+        response['Server-Timing'] = ', '.join(timings)
+
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': to_ms(elapsed),
+            'queries': metrics.query_count,
+            'db_ms': to_ms(metrics.db_seconds),
+            'duplicate_queries': sum(count - 1 for count in duplicates.values()),
+            **{f'{service}_ms': to_ms(seconds) for service, seconds in metrics.external_seconds.items()},
+        }
+        logger.info('request', **fields)
+
+        threshold = getattr(settings, 'DUPLICATE_QUERY_THRESHOLD')
+        for sql, count in duplicates.items():
+            if count >= threshold:
+                logger.warning('possible_n_plus_one', count=count, sql=sql, **fields)
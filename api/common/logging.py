@@ -0,0 +1,106 @@
+import copy
+import json
+import logging
+import queue
+import random
+from functools import partialmethod
+from logging.handlers import QueueHandler, QueueListener
+
+from django.utils.module_loading import import_string
+
+
+def _quote(value):
+    value = str(value)
+    if value and not any(char in value for char in ' "=\n'):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """record를 `key=value` 형식 한 줄로 만든다. StructLogger의 field는 뒤에 이어 붙인다."""
+
+    def format(self, record):
+        parts = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            parts['exc'] = record.exc_text
+
+        return ' '.join(f'{key}={_quote(value)}' for key, value in parts.items())
+
+
+class StructLogger:
+    """
+    event 이름과 key/value field로 남기는 logger.
+    level이 꺼져 있거나 sampling에서 빠지면 아무것도 만들지 않으며,
+    callable인 field 값은 실제로 기록할 때만 호출한다.
+
+        logger.debug('slot_checked', sample=0.01, room=room.id, conflicts=lambda: [...])
+    """
+
+    def __init__(self, name):
+        self.logger = logging.getLogger(name)
+
+    def log(self, level, event, sample=1.0, exc_info=None, **fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        if sample < 1 and random.random() >= sample:
+            return
+
+        fields = {key: value() if callable(value) else value for key, value in fields.items()}
+        self.logger.log(level, event, exc_info=exc_info, extra={'fields': fields}, stacklevel=2)
+
+    debug = partialmethod(log, logging.DEBUG)
+    info = partialmethod(log, logging.INFO)
+    warning = partialmethod(log, logging.WARNING)
+    error = partialmethod(log, logging.ERROR)
+
+    def exception(self, event, **fields):
+        self.log(logging.ERROR, event, exc_info=True, **fields)
+
+
+def get_logger(name):
+    return StructLogger(name)
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    record를 queue에 넣기만 하고 포맷팅과 출력은 QueueListener thread에서 처리한다.
+    queue가 가득 차면 요청 thread를 막지 않고 record를 버린다.
+    """
+
+    def __init__(self, handler='logging.StreamHandler', queue_size=10000, **kwargs):
+        super().__init__(queue.Queue(queue_size))
+        target = import_string(handler)(**kwargs)
+        target.setFormatter(KeyValueFormatter())
+
+        self.dropped = 0
+        self.listener = QueueListener(self.queue, target, respect_handler_level=True)
+        self.listener.start()
+
+    def prepare(self, record):
+        # 다른 thread로 넘기기 전에 message 인자와 traceback만 문자열로 고정한다.
+        record = copy.copy(record)
+        if record.args:
+            record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
@@ -0,0 +1,92 @@
+from contextlib import suppress
+from datetime import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from common.instrumentation import timed_external
+from common.outbox import claim_batch
+from common.retries import get_backoff
+from utils.models import QueuedEmail
+
+
+SENT, FAILED = 1, 2
+
+
+def build_mail(subject, recipients, template_name=None, context=None, message='', from_email=None, context_loader=None):
+    # 렌더링한 본문은 저장하지 않고 worker가 발송할 때 template과 context로 만든다.
+    # message도 context로 렌더링되는 template 문자열이다.
+    # 비밀번호처럼 저장하면 안 되는 값은 context_loader(함수의 dotted path)가 발송 시점에 context로 만든다.
+    return QueuedEmail(
+        subject=subject,
+        message=message,
+        template_name=template_name or '',
+        context=context or {},
+        context_loader=context_loader or '',
+        from_email=from_email,
+        recipients=list(recipients),
+    )
+
+
+def enqueue_mail(subject, recipients, template_name=None, context=None, message='', from_email=None, context_loader=None):
+    mail = build_mail(subject, recipients, template_name, context, message, from_email, context_loader)
+    mail.save()
+    return mail
+
+
+def claim_mails(batch_size):
+    return claim_batch(QueuedEmail.objects.all(), batch_size)
+
+
+def to_message(mail, connection):
+    context = import_string(mail.context_loader)(mail.context) if mail.context_loader else mail.context
+    body = Template(mail.message).render(Context(context, autoescape=False)) if mail.message else ''
+    message = EmailMultiAlternatives(
+        mail.subject, body, mail.from_email, mail.recipients, connection=connection
+    )
+    if mail.template_name:
+        message.attach_alternative(render_to_string(mail.template_name, context=context), 'text/html')
+    return message
+
+
+def send_pending_mails(batch_size=None):
+    """
+    대기 중인 메일을 batch_size만큼 가져와 SMTP 연결 하나로 발송
+    실패한 메일은 backoff 후 재시도하고 EMAIL_QUEUE_MAX_ATTEMPTS번 실패하면 FAILED로 기록
+    발송한 메일은 지우고, FAILED 메일은 본문과 context를 비워 둔다.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_QUEUE_BATCH_SIZE')
+    max_attempts = getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS')
+    mails = claim_mails(batch_size)
+    if not mails:
+        return mails
+
+    connection = get_connection()
+    try:
+        for mail in mails:
+            try:
+                with timed_external('smtp'):
+                    connection.open()
+                    connection.send_messages([to_message(mail, connection)])
+                mail.status = SENT
+            except Exception as e:
+                mail.last_error = repr(e)
+                if mail.attempts >= max_attempts:
+                    mail.status, mail.message, mail.context = FAILED, '', {}
+                else:
+                    mail.next_attempt_at = datetime.now() + get_backoff(mail.attempts)
+                # 연결이 끊겼을 수 있으므로 다음 메일은 새 연결로 보낸다.
+                with suppress(Exception):
+                    connection.close()
+    finally:
+        connection.close()
+
+    QueuedEmail.objects.filter(id__in=[mail.id for mail in mails if mail.status == SENT]).delete()
+    QueuedEmail.objects.bulk_update(
+        [mail for mail in mails if mail.status != SENT],
+        ['status', 'attempts', 'last_error', 'next_attempt_at', 'message', 'context'],
+    )
+    return mails
@@ -0,0 +1,57 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+PENDING = 0
+LEASE_SECONDS = 5 * 60
+
+
+def claim_batch(queryset, batch_size, lease_seconds=LEASE_SECONDS):
+    """
+    status, attempts, next_attempt_at 필드를 가진 outbox 테이블에서 처리할 행을 batch_size만큼 가져온다.
+    다른 worker가 같은 행을 가져가지 않도록 lease 시간만큼 다음 시도 시간을 미룬다.
+    """
+    now = datetime.now()
+    with transaction.atomic():
+        items = list(
+            queryset.select_for_update(skip_locked=True, of=("self",))
+            .filter(status=PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        for item in items:
+            item.attempts += 1
+            item.next_attempt_at = now + timedelta(seconds=lease_seconds)
+        queryset.model.objects.bulk_update(items, ["attempts", "next_attempt_at"])
+    return items
+
+
+class OutboxWorkerCommand(BaseCommand):
+    """outbox를 batch 단위로 처리하는 worker command, process와 report를 구현한다."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--once", action="store_true", help="처리할 작업이 없으면 종료"
+        )
+        parser.add_argument(
+            "--interval", type=float, default=1.0, help="처리할 작업이 없을 때 대기 시간(초)"
+        )
+
+    def process(self, options):
+        raise NotImplementedError
+
+    def report(self, items):
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        while True:
+            items = self.process(options)
+            if items:
+                self.stdout.write(self.report(items))
+            elif options["once"]:
+                return
+            else:
+                time.sleep(options["interval"])
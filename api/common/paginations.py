@@ -0,0 +1,141 @@
+import base64
+import hashlib
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import F, Q
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    기본은 PageNumberPagination과 같고 cursor query parameter를 넘기면 keyset pagination으로 동작
+    view의 cursor_ordering(인덱스가 있는 고유한 정렬)으로 마지막 행 다음부터 조회하므로
+    OFFSET, COUNT 없이 몇 번째 page든 같은 비용으로 조회한다.
+    count=true를 넘기면 cache된 전체 개수 추정값을 함께 반환
+    """
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.ordering = getattr(view, 'cursor_ordering', None)
+        if not self.ordering or self.cursor_query_param not in request.query_params:
+            self.ordering = None
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        self.count = self.get_estimated_count(queryset) if self.is_count_requested(request) else None
+
+        queryset = queryset.order_by(*self.get_order_by(queryset.model))
+        position = self.decode_cursor(queryset.model, request.query_params[self.cursor_query_param])
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+
+        rows = list(queryset[:page_size + 1])
+        page = rows[:page_size]
+        self.next_position = self.get_position(page[-1]) if len(rows) > page_size else None
+        return page
+
+    def get_fields(self, model):
+        return [model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+    def get_order_by(self, model):
+        # NULL은 가장 작은 값으로 취급해 DB와 관계없이 같은 순서로 정렬 (MySQL, sqlite의 기본 순서)
+        order_by = []
+        for name, field in zip(self.ordering, self.get_fields(model)):
+            if not field.null:
+                order_by.append(name)
+            elif name.startswith('-'):
+                order_by.append(F(field.name).desc(nulls_last=True))
+            else:
+                order_by.append(F(field.name).asc(nulls_first=True))
+        return order_by
+
+    def get_position(self, instance):
+        return [
+            None if field.value_from_object(instance) is None else field.value_to_string(instance)
+            for field in self.get_fields(type(instance))
+        ]
+
+    def get_after_filter(self, name, value):
+        # 정렬 순서에서 value 다음에 오는 행 (NULL은 가장 작은 값)
+        field = name.lstrip('-')
+        if not name.startswith('-'):
+            return Q(**{f'{field}__isnull': False}) if value is None else Q(**{f'{field}__gt': value})
+        if value is None:
+            return None
+        return Q(**{f'{field}__lt': value}) | Q(**{f'{field}__isnull': True})
+
+    def get_position_filter(self, position):
+        # (a, b, c) > (x, y, z) → a > x or (a = x and b > y) or (a = x and b = y and c > z)
+        conditions = []
+        for i, name in enumerate(self.ordering):
+            after = self.get_after_filter(name, position[i])
+            if after is None:
+                continue
+            equals = [
+                Q(**{f'{field.lstrip("-")}__isnull': True}) if value is None else Q(**{field.lstrip('-'): value})
+                for field, value in zip(self.ordering[:i], position[:i])
+            ]
+            conditions.append(reduce(and_, equals, after))
+        return reduce(or_, conditions, Q(pk__in=[]))
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, model, cursor):
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            fields = self.get_fields(model)
+            if len(values) != len(fields) or any(value is None and not field.null for field, value in zip(fields, values)):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(fields, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def is_count_requested(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true')
+
+    def get_estimated_count(self, queryset):
+        # 같은 조건의 개수는 PAGINATION_COUNT_TIMEOUT 동안 재사용하므로 실제 개수와 조금 다를 수 있다.
+        try:
+            query = str(queryset.order_by().query).encode()
+        except EmptyResultSet:
+            return 0
+        key = f'pagination:count:{hashlib.md5(query).hexdigest()}'
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, getattr(settings, 'PAGINATION_COUNT_TIMEOUT'))
+        return count
+
+    def get_next_link(self):
+        if self.ordering is None:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        if self.ordering is None:
+            return super().get_paginated_response(data)
+
+        response = {'next': self.get_next_link(), 'results': data}
+        if self.count is not None:
+            response['count'] = self.count
+        return Response(response)
@@ -0,0 +1,6 @@
+from datetime import timedelta
+
+
+def get_backoff(attempts, base_seconds=30, max_seconds=60 * 60):
+    """attempts번째 실패 후 다음 시도까지 대기할 시간 (지수 backoff)"""
+    return timedelta(seconds=min(base_seconds * 2 ** (attempts - 1), max_seconds))
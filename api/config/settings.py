@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "common.instrumentation.RequestInstrumentationMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -74,8 +75,17 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, "templates")],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # DEBUG 여부와 관계없이 메일 template을 한 번만 읽고 compile
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -104,9 +114,34 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# token, 참조 테이블, 회의실 가용성 cache의 무효화를 worker process 사이에 공유하려면 Redis를 써야 한다.
+# REDIS_URL이 없으면 process마다 따로인 LocMemCache를 쓴다. (로컬 개발, 테스트용)
+
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
+# 일괄 생성 시 비밀번호 hash를 계산할 process 수(기본값 cpu 수)와 process마다 넘길 비밀번호 수
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", 0)) or None
+PASSWORD_HASHING_CHUNK_SIZE = 64
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -150,21 +185,73 @@ AUTH_USER_MODEL = "users.User"
 
 
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "common.paginations.KeysetPagination",
     "PAGE_SIZE": 60,
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedTokenAuthentication",
     ],
 }
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# 한 요청에서 같은 형태의 query가 이 횟수 이상 실행되면 N+1 의심으로 경고
+DUPLICATE_QUERY_THRESHOLD = 10
+
+# 포맷팅과 출력은 BackgroundHandler의 listener thread에서 처리, module별 level은 loggers에서 지정
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "background": {
+            "()": "common.logging.BackgroundHandler",
+            "queue_size": 10000,
+        },
+    },
+    "root": {"handlers": ["background"], "level": "WARNING"},
+    "loggers": {
+        "django": {"handlers": ["background"], "level": "WARNING", "propagate": False},
+        "common": {"level": LOG_LEVEL},
+        "rooms": {"level": LOG_LEVEL},
+        "users": {"level": LOG_LEVEL},
+        "utils": {"level": LOG_LEVEL},
+    },
+}
+
+# cursor pagination에서 count=true로 요청한 전체 개수를 재사용하는 시간
+PAGINATION_COUNT_TIMEOUT = 60
+
+# token → user 조회 cache (process LRU 크기와 TTL, Django cache TTL)
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_LOCAL_TIMEOUT = 5
+TOKEN_CACHE_TIMEOUT = 60 * 5
+
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
 EMAIL_HOST = "smtp.naver.com"
 EMAIL_USE_TLS = True
 EMAIL_PORT = 587
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+EMAIL_TIMEOUT = 10
+
+EMAIL_QUEUE_BATCH_SIZE = 100
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
 
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.environ.get("GOOGLE_CLIENT_SECRET")
 GOOGLE_REDIRECT_URI = os.environ.get("GOOGLE_REDIRECT_URI")
+GOOGLE_OAUTH_URL = os.environ.get("GOOGLE_OAUTH_URL", "https://oauth2.googleapis.com")
+GOOGLE_CALENDAR_URL = os.environ.get(
+    "GOOGLE_CALENDAR_URL", "https://www.googleapis.com/calendar/v3"
+)
+GOOGLE_HTTP_TIMEOUT = (3.05, 10)
+GOOGLE_HTTP_RETRIES = 2
+GOOGLE_HTTP_POOL_SIZE = 10
+GOOGLE_CIRCUIT_BREAKER_THRESHOLD = 5
+GOOGLE_CIRCUIT_BREAKER_RESET_TIMEOUT = 30
+
+# shared: 예약자 캘린더의 이벤트 하나에 동반 참석자 초대, per_participant: 참석자마다 이벤트 생성
+GOOGLE_CALENDAR_SYNC_MODE = os.environ.get("GOOGLE_CALENDAR_SYNC_MODE", "shared")
+
+CALENDAR_SYNC_BATCH_SIZE = 50
+CALENDAR_SYNC_WORKERS = 8
+CALENDAR_SYNC_MAX_ATTEMPTS = 5
@@ -0,0 +1,58 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from rest_framework.test import APITestCase
+
+from common.instrumentation import RequestInstrumentationMiddleware, record_external
+from users.models import UserType
+from users.tests.factories import UserFactory, UserTypeFactory
+
+
+class RequestInstrumentationTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(user_type=UserTypeFactory())
+
+    def __call_middleware(self, view):
+        middleware = RequestInstrumentationMiddleware(view)
+        return middleware(RequestFactory().get('/api/test'))
+
+    def test_server_timing_header(self):
+        self.client.force_authenticate(user=self.user)
+
+        with self.assertLogs('common.instrumentation', 'INFO') as logs:
+            response = self.client.get('/api/rooms/my-reservations')
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        # 예약이 없으면 count query만 실행
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+        fields = logs.records[0].fields
+        self.assertEqual(logs.records[0].getMessage(), 'request')
+        self.assertEqual((fields['path'], fields['status'], fields['queries']), ('/api/rooms/my-reservations', 200, 1))
+
+    def test_external_time(self):
+        def view(request):
+            record_external('google', 0.05)
+            return HttpResponse()
+
+        with self.assertLogs('common.instrumentation', 'INFO') as logs:
+            response = self.__call_middleware(view)
+
+        self.assertIn('google;dur=50.0', response['Server-Timing'])
+        self.assertEqual(logs.records[0].fields['google_ms'], 50.0)
+
+    @override_settings(DUPLICATE_QUERY_THRESHOLD=3)
+    def test_duplicate_queries_are_flagged(self):
+        def view(request):
+            for user_type_id in range(3):
+                UserType.objects.filter(id=user_type_id).first()
+            return HttpResponse()
+
+        with self.assertLogs('common.instrumentation', 'INFO') as logs:
+            response = self.__call_middleware(view)
+
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+        self.assertEqual(logs.records[0].fields['duplicate_queries'], 2)
+        self.assertEqual(logs.records[1].getMessage(), 'possible_n_plus_one')
+        self.assertEqual(logs.records[1].fields['count'], 3)
@@ -0,0 +1,81 @@
+import io
+import logging
+from unittest import TestCase, mock
+
+from common.logging import BackgroundHandler, KeyValueFormatter, get_logger
+
+
+class StructLoggerTestCase(TestCase):
+    def setUp(self):
+        self.logger = get_logger('tests.logging')
+        self.logger.logger.setLevel(logging.INFO)
+        self.addCleanup(self.logger.logger.setLevel, logging.NOTSET)
+
+    def test_fields_are_structured(self):
+        with self.assertLogs('tests.logging', 'INFO') as logs:
+            self.logger.info('schedule_conflict', room=1, conflicts=[3, 4])
+
+        record = logs.records[0]
+        self.assertEqual(record.getMessage(), 'schedule_conflict')
+        self.assertDictEqual(record.fields, {'room': 1, 'conflicts': [3, 4]})
+        self.assertRegex(
+            KeyValueFormatter().format(record),
+            r'^ts=.+ level=INFO logger=tests.logging event=schedule_conflict room=1 conflicts="\[3, 4\]"$',
+        )
+
+    def test_lazy_fields_are_not_evaluated_when_disabled(self):
+        expensive = mock.Mock(return_value='value')
+
+        self.logger.debug('debug_event', value=expensive)
+        expensive.assert_not_called()
+
+        with self.assertLogs('tests.logging', 'INFO') as logs:
+            self.logger.info('info_event', value=expensive)
+        self.assertEqual(logs.records[0].fields['value'], 'value')
+
+    def test_sampling(self):
+        with mock.patch('common.logging.random.random', side_effect=[0.5, 0.05]):
+            with self.assertLogs('tests.logging', 'INFO') as logs:
+                self.logger.info('sampled_event', sample=0.1, n=1)
+                self.logger.info('sampled_event', sample=0.1, n=2)
+
+        self.assertListEqual([record.fields['n'] for record in logs.records], [2])
+
+
+class BackgroundHandlerTestCase(TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.logger = logging.getLogger('tests.background')
+        self.logger.propagate = False
+        self.addCleanup(setattr, self.logger, 'propagate', True)
+
+    def __add_handler(self, **kwargs):
+        handler = BackgroundHandler(stream=self.stream, **kwargs)
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+        return handler
+
+    def test_formats_on_listener_thread(self):
+        handler = self.__add_handler()
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            get_logger('tests.background').exception('sync_failed', task=7)
+        self.logger.warning('%s retries', 3)
+        handler.close()
+
+        lines = self.stream.getvalue().splitlines()
+        self.assertIn('event=sync_failed task=7 exc="Traceback', lines[0])
+        self.assertIn('ValueError: boom', lines[0])
+        self.assertIn('event="3 retries"', lines[1])
+
+    def test_drops_records_when_queue_is_full(self):
+        handler = self.__add_handler(queue_size=1)
+        handler.listener.stop()
+
+        self.logger.warning('first')
+        self.logger.warning('second')
+
+        self.assertEqual(handler.dropped, 1)
+        handler.queue.get_nowait()
+        handler.close()
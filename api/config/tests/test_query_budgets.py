@@ -0,0 +1,298 @@
+import datetime
+import json
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.urls import URLResolver, get_resolver
+
+from rest_framework.test import APITestCase
+
+from common.instrumentation import RequestMetrics
+from rooms.models import CancelledOccurrence, RoomImages
+from rooms.tests.factories import ReservationFactory, RoomFactory
+from users.authentication import local_token_cache
+from users.models import UserDepartment
+from users.references import user_departments, user_types
+from users.tests.factories import TEST_PASSWORD, UserFactory, UserTypeFactory
+from users.tests.test_imports import make_csv
+from utils.models import Comment, Notice, Report
+
+
+BUDGET_FILE = Path(__file__).with_name('query_budgets.json')
+
+# 1건일 때와 비교할 데이터 수
+ROWS = 5
+
+# query 수를 검사하지 않는 route와 그 이유
+EXEMPT_ROUTES = {
+    '^swagger$': 'schema 문서 페이지',
+    'api/admin/': 'django admin',
+    'api/users/google-login': 'google OAuth redirect, DB 조회 1건',
+    'api/users/google-callback': 'google OAuth 외부 호출 (users/tests/test_google_account.py)',
+    'api/users/google-revoke': 'google OAuth 외부 호출 (users/tests/test_google_account.py)',
+}
+
+CASES = {}
+
+
+def budget(method, route):
+    def decorator(func):
+        CASES[f'{method} {route}'] = func
+        return func
+
+    return decorator
+
+
+def iter_routes(patterns, prefix=''):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver) and route not in EXEMPT_ROUTES:
+            yield from iter_routes(pattern.url_patterns, route)
+        else:
+            yield route
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    모든 API route를 1건, ROWS건의 데이터로 호출해 query 수가 데이터 수에 따라 늘지 않고
+    query_budgets.json의 예산을 넘지 않는지 검사한다.
+    """
+    date = datetime.date(2023, 6, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = UserFactory(user_type=UserTypeFactory.create_admin_user_type())
+        cls.user_type = UserTypeFactory()
+        cls.department = UserDepartment.objects.create(name='컴퓨터공학과')
+        cls.user = UserFactory(user_type=cls.user_type, department=cls.department)
+        cls.budgets = json.loads(BUDGET_FILE.read_text())
+
+    def __clear_caches(self):
+        cache.clear()
+        local_token_cache.clear()
+        # 참조 테이블은 process마다 한 번만 읽으므로 미리 채워 둔다.
+        for table in (user_types, user_departments):
+            table.clear()
+            table.all()
+
+    def __measure(self, case, rows):
+        with transaction.atomic():
+            method, path, kwargs, user = case(self, rows)
+            self.__clear_caches()
+            self.client.cookies.clear()
+            # 요청 중 변경된 user instance가 다음 측정에 남지 않도록 새로 조회
+            self.client.force_authenticate(user=user and type(user).objects.get(id=user.id))
+
+            metrics = RequestMetrics()
+            with connection.execute_wrapper(metrics):
+                response = getattr(self.client, method.lower())(path, **kwargs)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+
+            self.assertLess(response.status_code, 300, f'{method} {path}: {response.status_code}')
+            transaction.set_rollback(True)
+
+        return metrics
+
+    def test_routes_have_budget(self):
+        covered = {key.split(' ', 1)[1] for key in CASES}
+        missing = [route for route in iter_routes(get_resolver().url_patterns) if route not in covered | EXEMPT_ROUTES.keys()]
+
+        self.assertListEqual(missing, [], 'query budget case가 없는 route')
+        self.assertSetEqual(set(CASES), set(self.budgets), f'{BUDGET_FILE.name}와 case 목록이 다름')
+
+    def test_query_budgets(self):
+        for key, case in CASES.items():
+            with self.subTest(key):
+                single, multiple = self.__measure(case, 1), self.__measure(case, ROWS)
+                duplicates = '\n'.join(f'{count}x {sql}' for sql, count in multiple.get_duplicates().items())
+                detail = f'{key}: 1건 {single.query_count}, {ROWS}건 {multiple.query_count} queries\n{duplicates}'
+
+                self.assertEqual(multiple.query_count, single.query_count, f'데이터 수에 따라 query 증가\n{detail}')
+                self.assertLessEqual(multiple.query_count, self.budgets[key], f'query 예산 초과\n{detail}')
+
+    def __users(self, rows):
+        return UserFactory.create_batch(rows, user_type=self.user_type, department=self.department)
+
+    def __reservations(self, rows, **kwargs):
+        room = RoomFactory(images=RoomImages.objects.create(image='images/room.png'))
+        reservations = [
+            ReservationFactory(room=room, date=self.date, start=datetime.time(hour), end=datetime.time(hour + 1), **kwargs)
+            for hour in range(8, 8 + rows)
+        ]
+        for reservation in reservations:
+            reservation.companion.set(self.__users(2))
+        return reservations
+
+    # users
+    @budget('GET', '^api/users$')
+    def users_list(self, rows):
+        self.__users(rows)
+        return 'GET', '/api/users', {}, self.admin_user
+
+    @budget('GET', '^api/users/mine$')
+    def users_mine(self, rows):
+        self.__users(rows)
+        return 'GET', '/api/users/mine', {}, self.user
+
+    @budget('GET', '^api/users/(?P<pk>[0-9]+)$')
+    def users_detail(self, rows):
+        self.__users(rows)
+        return 'GET', f'/api/users/{self.user.id}', {}, self.admin_user
+
+    @budget('POST', 'api/users/login')
+    def users_login(self, rows):
+        self.__users(rows)
+        data = {'username': self.user.user_no, 'password': TEST_PASSWORD}
+        return 'POST', '/api/users/login', {'data': data, 'format': 'json'}, None
+
+    @budget('GET', 'api/users/types')
+    def user_types_list(self, rows):
+        UserTypeFactory.create_batch(rows)
+        return 'GET', '/api/users/types', {}, self.user
+
+    @budget('GET', 'api/users/departments')
+    def user_departments_list(self, rows):
+        UserDepartment.objects.bulk_create(UserDepartment(name=f'학과{i}') for i in range(rows))
+        return 'GET', '/api/users/departments', {}, self.user
+
+    @budget('PATCH', 'api/users/password')
+    def users_password(self, rows):
+        self.__users(rows)
+        data = {'current_password': TEST_PASSWORD, 'new_password': 'new-password'}
+        return 'PATCH', '/api/users/password', {'data': data, 'format': 'json'}, self.user
+
+    @budget('POST', 'api/users/bulk')
+    def users_bulk_create(self, rows):
+        lines = [
+            (f'2023000{i}', 'password', '홍길동', f'2023000{i}@example.com', self.user_type.id, self.department.id)
+            for i in range(rows)
+        ]
+        file = SimpleUploadedFile('users.csv', make_csv(lines), content_type='text/csv')
+        return 'POST', '/api/users/bulk', {'data': {'user_input': file}, 'format': 'multipart'}, self.admin_user
+
+    @budget('DELETE', 'api/users/bulk')
+    def users_bulk_delete(self, rows):
+        data = '\n'.join(user.user_no for user in self.__users(rows))
+        return 'DELETE', '/api/users/bulk', {'data': data, 'content_type': 'text/plain'}, self.admin_user
+
+    @budget('GET', 'api/users/noshow')
+    def users_noshow(self, rows):
+        self.__reservations(rows)
+        return 'GET', '/api/users/noshow', {}, self.admin_user
+
+    @budget('GET', 'api/users/types/noshow')
+    def user_types_noshow(self, rows):
+        self.__reservations(rows)
+        return 'GET', '/api/users/types/noshow', {}, self.admin_user
+
+    # rooms
+    @budget('GET', 'api/rooms')
+    def rooms_list(self, rows):
+        for _ in range(rows):
+            RoomFactory(images=RoomImages.objects.create(image='images/room.png'))
+        return 'GET', '/api/rooms', {}, self.user
+
+    @budget('GET', 'api/rooms/<int:id>')
+    def rooms_detail(self, rows):
+        reservation = self.__reservations(rows)[0]
+        return 'GET', f'/api/rooms/{reservation.room_id}', {}, self.user
+
+    @budget('GET', 'api/rooms/availability')
+    def rooms_availability(self, rows):
+        room_ids = [self.__reservations(1)[0].room_id for _ in range(rows)]
+        path = f'/api/rooms/availability?start={self.date}&rooms={",".join(map(str, room_ids))}'
+        return 'GET', path, {}, self.user
+
+    @budget('GET', 'api/rooms/reservations')
+    def reservations_list(self, rows):
+        self.__reservations(rows)
+        return 'GET', '/api/rooms/reservations', {}, self.user
+
+    @budget('POST', 'api/rooms/reservations')
+    def reservations_create(self, rows):
+        room_id = self.__reservations(rows)[0].room_id
+        data = {
+            'booker': self.user.id,
+            'room': room_id,
+            'date': self.date.isoformat(),
+            'start': '20:00:00',
+            'end': '21:00:00',
+            'reason': '회의',
+            'companion': [user.id for user in self.__users(rows)],
+        }
+        return 'POST', '/api/rooms/reservations', {'data': data, 'format': 'json'}, self.user
+
+    @budget('GET', 'api/rooms/my-reservations')
+    def my_reservations_list(self, rows):
+        self.__reservations(rows, booker=self.user)
+        return 'GET', '/api/rooms/my-reservations', {}, self.user
+
+    @budget('GET', 'api/rooms/my-reservations/<int:pk>')
+    def my_reservations_detail(self, rows):
+        reservation = self.__reservations(rows, booker=self.user)[0]
+        reservation.companion.set(self.__users(rows))
+        return 'GET', f'/api/rooms/my-reservations/{reservation.id}', {}, self.user
+
+    @budget('DELETE', 'api/rooms/my-reservations/<int:pk>')
+    def my_reservations_delete(self, rows):
+        reservation = self.__reservations(rows, booker=self.user)[0]
+        reservation.companion.set(self.__users(rows))
+        return 'DELETE', f'/api/rooms/my-reservations/{reservation.id}', {}, self.user
+
+    @budget('DELETE', 'api/rooms/my-reservations/<int:pk>/occurrences/<str:date>')
+    def my_reservations_cancel_occurrence(self, rows):
+        reservation = self.__reservations(1, booker=self.user, is_scheduled=True, day=['thu'], schedule_daedline=self.date + datetime.timedelta(weeks=rows + 1))[0]
+        CancelledOccurrence.objects.bulk_create(
+            CancelledOccurrence(reservation=reservation, date=self.date + datetime.timedelta(weeks=week)) for week in range(1, rows + 1)
+        )
+        date = self.date + datetime.timedelta(weeks=rows + 1)
+        return 'DELETE', f'/api/rooms/my-reservations/{reservation.id}/occurrences/{date}', {}, self.user
+
+    @budget('POST', 'api/rooms/reservations/<int:id>/location')
+    def reservations_location(self, rows):
+        reservation = self.__reservations(rows, booker=self.user)[0]
+        reservation.date, reservation.start = datetime.date.today(), datetime.datetime.now().time()
+        reservation.save()
+        path = f'/api/rooms/reservations/{reservation.id}/location?latitude=37.5511&logtitude=127.07575'
+        return 'POST', path, {}, self.user
+
+    # utils
+    def __reports(self, rows):
+        reports = Report.objects.bulk_create(
+            Report(reporter=self.user, category='1', title=f'신고{i}', content='내용') for i in range(rows)
+        )
+        Comment.objects.bulk_create(Comment(author=self.admin_user, report=report, content='답변') for report in reports)
+        return reports
+
+    @budget('GET', 'api/utils/notice')
+    def notice_list(self, rows):
+        Notice.objects.bulk_create(Notice(title=f'공지{i}', content='내용') for i in range(rows))
+        return 'GET', '/api/utils/notice', {}, self.user
+
+    @budget('GET', 'api/utils/notice/<int:pk>')
+    def notice_detail(self, rows):
+        notices = Notice.objects.bulk_create(Notice(title=f'공지{i}', content='내용') for i in range(rows))
+        return 'GET', f'/api/utils/notice/{notices[0].id}', {}, self.user
+
+    @budget('GET', 'api/utils/report')
+    def report_list(self, rows):
+        self.__reports(rows)
+        return 'GET', '/api/utils/report', {}, self.user
+
+    @budget('GET', 'api/utils/report/<int:pk>')
+    def report_detail(self, rows):
+        report = self.__reports(rows)[0]
+        return 'GET', f'/api/utils/report/{report.id}', {}, self.user
+
+    @budget('GET', 'api/utils/comment')
+    def comment_list(self, rows):
+        self.__reports(rows)
+        return 'GET', '/api/utils/comment', {}, self.admin_user
+
+    @budget('GET', 'api/utils/comment/<int:pk>')
+    def comment_detail(self, rows):
+        comment = Comment.objects.get(report=self.__reports(rows)[0])
+        return 'GET', f'/api/utils/comment/{comment.id}', {}, self.admin_user
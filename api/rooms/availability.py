@@ -0,0 +1,125 @@
+import base64
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime, time as Time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .conflicts import to_seconds
+from .models import CancelledOccurrence, Reservation
+from .recurrences import iter_occurrences
+
+
+SLOT_MINUTES = 5
+SLOT_SECONDS = SLOT_MINUTES * 60
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+# 예약 변경은 version key로 무효화하므로 process 사이에 cache가 공유되어야 한다. (settings.REDIS_URL)
+AVAILABILITY_TIMEOUT = 60 * 60 * 24
+
+Occurrence = namedtuple(
+    "Occurrence",
+    ["id", "room_id", "is_scheduled", "date", "schedule_daedline", "weekday_mask", "start", "end"],
+)
+
+
+def get_availability_version_key(room_id):
+    return f"rooms:availability-version:{room_id}"
+
+
+def get_availability_key(room_id, version, date):
+    return f"rooms:availability:{room_id}:{version}:{date}"
+
+
+def invalidate_availability(room_id):
+    try:
+        cache.incr(get_availability_version_key(room_id))
+    except ValueError:
+        # 버전이 없으면 다음 조회 때 새 버전으로 시작하므로 무효화할 캐시도 없다.
+        pass
+
+
+def get_availability_versions(room_ids):
+    keys = {room_id: get_availability_version_key(room_id) for room_id in room_ids}
+    versions = cache.get_many(keys.values())
+    for room_id, key in keys.items():
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return {room_id: versions[key] for room_id, key in keys.items()}
+
+
+def fill_bitmap(bitmap, start, end):
+    # 5분 단위 slot 중 [start, end)와 조금이라도 겹치는 slot을 사용 중으로 표시
+    first = to_seconds(start) // SLOT_SECONDS
+    last = min(-(-to_seconds(end) // SLOT_SECONDS), SLOTS_PER_DAY)
+    for slot in range(first, last):
+        bitmap[slot // 8] |= 0x80 >> (slot % 8)
+
+
+def build_bitmaps(room_ids, dates):
+    """
+    (room_id, date) 쌍마다 slot bitmap을 계산
+    단일 예약과 기간이 겹치는 반복 예약을 한 번의 쿼리로 가져와 펼친다.
+    반복 예약 중 취소된 날짜는 빈 시간으로 취급한다.
+    """
+    since, until = min(dates), max(dates)
+    bitmaps = {(room_id, date): bytearray(SLOTS_PER_DAY // 8) for room_id in room_ids for date in dates}
+
+    rows = Reservation.objects.filter(room_id__in=room_ids).filter(
+        Q(
+            is_scheduled=False,
+            starts_at__gte=datetime.combine(since, Time.min),
+            starts_at__lt=datetime.combine(until + timedelta(days=1), Time.min),
+        )
+        | (
+            Q(is_scheduled=True, date__lte=until)
+            & (Q(schedule_daedline__isnull=True) | Q(schedule_daedline__gte=since))
+        )
+    ).values_list(*Occurrence._fields)
+
+    occurrences = list(map(Occurrence._make, rows))
+    cancelled = defaultdict(set)
+    series_ids = [occurrence.id for occurrence in occurrences if occurrence.is_scheduled]
+    if series_ids:
+        for reservation_id, date in CancelledOccurrence.objects.filter(
+            reservation_id__in=series_ids, date__range=(since, until)
+        ).values_list("reservation_id", "date"):
+            cancelled[reservation_id].add(date)
+
+    for occurrence in occurrences:
+        for date in iter_occurrences(occurrence, since, until, cancelled[occurrence.id]):
+            bitmap = bitmaps.get((occurrence.room_id, date))
+            if bitmap is not None:
+                fill_bitmap(bitmap, occurrence.start, occurrence.end)
+
+    return bitmaps
+
+
+def get_availability(room_ids, since, until):
+    """
+    회의실별, 날짜별 free/busy bitmap을 base64 문자열로 반환
+    bit 하나가 5분 slot 하나이며, 사용 중이면 1(0시 slot이 첫 byte의 최상위 bit)
+    """
+    dates = [since + timedelta(days=offset) for offset in range((until - since).days + 1)]
+    versions = get_availability_versions(room_ids)
+    keys = {
+        (room_id, date): get_availability_key(room_id, versions[room_id], date)
+        for room_id in room_ids
+        for date in dates
+    }
+    cached = cache.get_many(keys.values())
+
+    missing = [slot for slot, key in keys.items() if key not in cached]
+    if missing:
+        bitmaps = build_bitmaps(
+            sorted({room_id for room_id, _ in missing}), sorted({date for _, date in missing})
+        )
+        encoded = {keys[slot]: base64.b64encode(bitmaps[slot]).decode() for slot in missing}
+        cache.set_many(encoded, AVAILABILITY_TIMEOUT)
+        cached.update(encoded)
+
+    results = {str(room_id): {} for room_id in room_ids}
+    for (room_id, date), key in keys.items():
+        results[str(room_id)][date.isoformat()] = cached[key]
+    return results
@@ -0,0 +1,279 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+
+import pytz
+from django.conf import settings
+from django.db import connections
+
+from rest_framework.exceptions import APIException
+
+from common.calendars import (
+    cancel_calendar_event_occurrence,
+    create_calendar_event,
+    delete_calendar_event,
+    get_access_token,
+    get_recurrence,
+)
+from common import outbox
+from common.http import CircuitBreakerOpen, google_client
+from common.outbox import claim_batch
+from common.retries import get_backoff
+from users.models import User
+from .models import CalendarSyncTask, GoogleCalenderLog, Reservation, get_period
+from .recurrences import get_weekdays, iter_occurrences
+
+
+PENDING, DONE, FAILED = outbox.PENDING, 1, 2
+SHARED, PER_PARTICIPANT = "shared", "per_participant"
+
+
+class CalendarSyncError(Exception):
+    pass
+
+
+def localize(date, time=None):
+    value = date if time is None else datetime.combine(date, time)
+    return pytz.timezone(settings.TIME_ZONE).localize(value)
+
+
+def get_event_payload(reservation):
+    """
+    반복 예약은 첫 일정을 이벤트 시작으로 두고 나머지 일정을 RRULE로 표현한 반복 이벤트 하나로 만든다.
+    """
+    starts_at, ends_at, payload = reservation.starts_at, reservation.ends_at, {}
+    if reservation.is_scheduled:
+        date = next(
+            iter_occurrences(
+                reservation,
+                reservation.date,
+                reservation.schedule_daedline or reservation.date.max,
+            ),
+            reservation.date,
+        )
+        starts_at, ends_at = get_period(date, reservation.start, reservation.end)
+        until = None
+        if reservation.schedule_daedline:
+            until = localize(reservation.schedule_daedline, time.max)
+        payload["recurrence"] = get_recurrence(get_weekdays(reservation.weekday_mask), until)
+
+    return {
+        "summary": reservation.reason,
+        "start_datetime": localize(starts_at).isoformat(),
+        "end_datetime": localize(ends_at).isoformat(),
+        "location": reservation.room.name if reservation.room else None,
+        **payload,
+    }
+
+
+def get_participants(reservation):
+    """
+    예약자와 동반 참석자의 (이메일, 구글 계정 연동 여부)를 한 번의 쿼리로 조회
+    """
+    participant_ids = [reservation.booker_id] + [
+        companion.id for companion in reservation.companion.all()
+    ]
+    rows = User.objects.filter(id__in=participant_ids).values_list(
+        "id", "email", "google_account"
+    )
+    return {id: (email, google_account is not None) for id, email, google_account in rows}
+
+
+def enqueue_event_creations(reservation):
+    """
+    구글 캘린더 이벤트 생성 작업 등록, 예약 저장과 같은 transaction 안에서 호출해야 한다.
+    shared: 예약자의 캘린더에 이벤트 하나를 만들고 동반 참석자들을 attendee로 초대
+    per_participant: 구글 계정을 연동한 참석자마다 각자의 캘린더에 이벤트 생성
+    """
+    participants = get_participants(reservation)
+    payload = get_event_payload(reservation)
+    booker_id = reservation.booker_id
+
+    if getattr(settings, "GOOGLE_CALENDAR_SYNC_MODE") == SHARED and participants[booker_id][1]:
+        attendees = [
+            email for id, (email, _) in participants.items() if id != booker_id and email
+        ]
+        tasks = [
+            CalendarSyncTask(
+                action="create",
+                owner_id=booker_id,
+                reservation=reservation,
+                payload={**payload, "attendees": attendees},
+            )
+        ]
+    else:
+        tasks = [
+            CalendarSyncTask(
+                action="create",
+                owner_id=owner_id,
+                reservation=reservation,
+                payload=payload,
+            )
+            for owner_id, (_, has_google_account) in participants.items()
+            if has_google_account
+        ]
+
+    return CalendarSyncTask.objects.bulk_create(tasks)
+
+
+def enqueue_occurrence_cancellations(reservation, date):
+    """
+    반복 예약의 date 일정 하나만 취소하는 작업 등록
+    """
+    logs = GoogleCalenderLog.objects.filter(reservation=reservation)
+    original_start_datetime = localize(date, reservation.start).isoformat()
+    return CalendarSyncTask.objects.bulk_create(
+        [
+            CalendarSyncTask(
+                action="cancel_occurrence",
+                owner_id=log.owner_id,
+                reservation=reservation,
+                payload={
+                    "event_id": log.event_id,
+                    "original_start_datetime": original_start_datetime,
+                    "notify_attendees": log.is_shared,
+                },
+            )
+            for log in logs
+        ]
+    )
+
+
+def enqueue_event_deletions(reservation):
+    """
+    예약에 연결된 구글 캘린더 이벤트마다 삭제 작업 등록
+    예약이 삭제되어도 작업이 남도록 event_id를 payload에 복사해 둔다.
+    """
+    logs = GoogleCalenderLog.objects.filter(reservation=reservation)
+    return CalendarSyncTask.objects.bulk_create(
+        [
+            CalendarSyncTask(
+                action="delete",
+                owner_id=log.owner_id,
+                payload={"event_id": log.event_id, "notify_attendees": log.is_shared},
+            )
+            for log in logs
+        ]
+    )
+
+
+def claim_tasks(batch_size):
+    return claim_batch(
+        CalendarSyncTask.objects.select_related("owner__google_account"), batch_size
+    )
+
+
+def run_task(task):
+    """
+    구글 캘린더 API 요청만 수행하고 DB에 접근하지 않는다.
+    이벤트를 생성한 경우 저장 전의 GoogleCalenderLog를 반환
+    """
+    if task.action == "create":
+        response = create_calendar_event(user=task.owner, **task.payload)
+        if response.status_code != 200:
+            raise CalendarSyncError(response.text)
+        return GoogleCalenderLog(
+            owner=task.owner,
+            event_id=response.json()["id"],
+            reservation_id=task.reservation_id,
+            is_shared="attendees" in task.payload,
+        )
+    elif task.action == "cancel_occurrence":
+        response = cancel_calendar_event_occurrence(task.owner, **task.payload)
+        if response.status_code not in (200, 404, 410):
+            raise CalendarSyncError(response.text)
+    elif task.action == "delete":
+        response = delete_calendar_event(task.owner, **task.payload)
+        # 이미 삭제된 이벤트는 성공으로 처리
+        if response.status_code not in (200, 204, 404, 410):
+            raise CalendarSyncError(response.text)
+    return None
+
+
+def process_task(task):
+    max_attempts = getattr(settings, "CALENDAR_SYNC_MAX_ATTEMPTS")
+    log = None
+    try:
+        if task.action != "delete" and task.reservation_id is None:
+            task.status = DONE  # 작업 처리 전에 예약이 삭제된 경우
+        else:
+            log = run_task(task)
+            task.status = DONE
+        task.last_error = ""
+    except CircuitBreakerOpen as e:
+        # 구글 API 장애로 요청을 보내지 않았으므로 시도 횟수에 포함하지 않는다.
+        task.attempts -= 1
+        task.last_error = str(e)
+        task.next_attempt_at = datetime.now() + timedelta(seconds=google_client.breaker.reset_timeout)
+    except APIException as e:
+        # 구글 계정 연동이 해제된 경우 재시도해도 성공할 수 없다.
+        task.status, task.last_error = FAILED, str(e)
+    except Exception as e:
+        task.last_error = repr(e)
+        if task.attempts >= max_attempts:
+            task.status = FAILED
+        else:
+            task.next_attempt_at = datetime.now() + get_backoff(task.attempts)
+    return log
+
+
+def process_task_in_thread(task):
+    try:
+        return process_task(task)
+    finally:
+        connections.close_all()
+
+
+def prepare_access_tokens(tasks):
+    # token 갱신과 저장은 main thread에서 미리 처리해 worker thread는 캐시된 token으로 HTTP 요청만 보낸다.
+    owners = {task.owner_id: task.owner for task in tasks}
+    for owner in owners.values():
+        try:
+            get_access_token(owner)
+        except Exception:
+            pass  # 실패한 작업은 process_task에서 기록
+
+
+def save_results(tasks, logs):
+    # 작업이 처리되는 동안 삭제된 예약의 이벤트는 바로 삭제 작업으로 등록
+    reservation_ids = set(
+        Reservation.objects.filter(id__in={log.reservation_id for log in logs}).values_list(
+            "id", flat=True
+        )
+    )
+    orphans = [log for log in logs if log.reservation_id not in reservation_ids]
+
+    GoogleCalenderLog.objects.bulk_create(
+        [log for log in logs if log.reservation_id in reservation_ids]
+    )
+    CalendarSyncTask.objects.bulk_create(
+        [
+            CalendarSyncTask(
+                action="delete",
+                owner_id=log.owner_id,
+                payload={"event_id": log.event_id, "notify_attendees": log.is_shared},
+            )
+            for log in orphans
+        ]
+    )
+    CalendarSyncTask.objects.bulk_update(
+        tasks, ["status", "attempts", "last_error", "next_attempt_at"]
+    )
+
+
+def process_pending_tasks(batch_size=None, workers=None):
+    """
+    대기 중인 작업을 batch_size만큼 가져와 workers개의 thread로 동시에 처리
+    생성된 GoogleCalenderLog와 작업 상태는 batch마다 한 번에 저장한다.
+    """
+    batch_size = batch_size or getattr(settings, "CALENDAR_SYNC_BATCH_SIZE")
+    workers = workers or getattr(settings, "CALENDAR_SYNC_WORKERS")
+    tasks = claim_tasks(batch_size)
+    if not tasks:
+        return tasks
+
+    prepare_access_tokens(tasks)
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        logs = [log for log in executor.map(process_task_in_thread, tasks) if log is not None]
+
+    save_results(tasks, logs)
+    return tasks
@@ -0,0 +1,188 @@
+from datetime import date as Date, timedelta
+
+import numpy as np
+from django.db.models import Exists, OuterRef, Q
+
+from .models import CancelledOccurrence, Reservation
+from .recurrences import get_weekdays
+
+
+def to_seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def to_weekday_bits(ordinals):
+    # date.fromordinal(1)은 월요일
+    return np.left_shift(1, (ordinals - 1) % 7)
+
+
+class RecurringSeriesIndex:
+    """
+    회의실 하나의 반복 예약(is_scheduled) 목록을 열 단위 numpy 배열로 보관하는 인덱스.
+    새 예약과 모든 반복 예약의 요일, 기간, 시간 겹침을 한 번의 벡터 연산으로 판단한다.
+    """
+
+    COLUMNS = ("id", "weekday_mask", "start", "end", "first", "last")
+
+    def __init__(self, rows):
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1, len(self.COLUMNS))
+        self.ids, self.masks, self.starts, self.ends, self.firsts, self.lasts = rows.T
+
+    @classmethod
+    def build(cls, room_id):
+        series = Reservation.objects.filter(room_id=room_id, is_scheduled=True).values_list(
+            "id", "weekday_mask", "start", "end", "date", "schedule_daedline"
+        )
+        return cls(
+            [
+                (
+                    id,
+                    weekday_mask,
+                    to_seconds(start),
+                    to_seconds(end),
+                    (first or Date.min).toordinal(),
+                    (last or Date.max).toordinal(),
+                )
+                for id, weekday_mask, start, end, first, last in series
+            ]
+        )
+
+    def __overlaps_time(self, start, end):
+        return (self.starts < to_seconds(end)) & (self.ends > to_seconds(start))
+
+    def conflicts(self, date, start, end):
+        ordinal = date.toordinal()
+        hit = (
+            (self.masks & (1 << date.weekday()) != 0)
+            & (self.firsts <= ordinal)
+            & (self.lasts >= ordinal)
+            & self.__overlaps_time(start, end)
+        )
+        return self.ids[hit].tolist()
+
+    def series_conflicts(self, weekday_mask, first, last, start, end):
+        # 두 반복 예약의 기간이 겹치는 구간 안에 실제로 존재하는 요일만 비교
+        lo = np.maximum(self.firsts, first.toordinal())
+        hi = np.minimum(self.lasts, (last or Date.max).toordinal())
+        span_mask = np.zeros_like(lo)
+        for offset in range(7):
+            day = lo + offset
+            span_mask |= np.where(day <= hi, to_weekday_bits(day), 0)
+
+        hit = (self.masks & span_mask & weekday_mask != 0) & self.__overlaps_time(start, end)
+        return self.ids[hit].tolist()
+
+
+def find_schedule_conflicts(room_id, date, start, end, weekday_mask=0, until=None):
+    """
+    회의실에서 [start, end) 시간대와 겹치는 예약의 id 목록
+    weekday_mask가 주어지면 date부터 until까지 해당 요일마다 반복되는 예약으로 취급한다.
+    lock을 잡은 뒤 검사하므로 cache 없이 매번 DB에서 조회한다.
+    """
+    series_index = RecurringSeriesIndex.build(room_id)
+    if not weekday_mask:
+        series_ids = series_index.conflicts(date, start, end)
+        if series_ids:
+            # 해당 날짜의 일정만 취소된 반복 예약 제외
+            cancelled = CancelledOccurrence.objects.filter(
+                reservation_id__in=series_ids, date=date
+            ).values_list("reservation_id", flat=True)
+            series_ids = sorted(set(series_ids).difference(cancelled))
+        # (room, date, start, end) index 범위 조회
+        singles = Reservation.objects.filter(
+            room_id=room_id, date=date, is_scheduled=False, start__lt=end, end__gt=start
+        ).order_by("start", "id")
+        return list(singles.values_list("id", flat=True)) + series_ids
+
+    singles = Reservation.objects.filter(
+        room_id=room_id,
+        is_scheduled=False,
+        date__gte=date,
+        start__lt=end,
+        end__gt=start,
+        date__week_day__in=[(weekday + 1) % 7 + 1 for weekday in get_weekdays(weekday_mask)],
+    )
+    if until is not None:
+        singles = singles.filter(date__lte=until)
+
+    return list(singles.values_list("id", flat=True)) + series_index.series_conflicts(
+        weekday_mask, date, until, start, end
+    )
+
+
+def get_first_common_date(first, last, weekday_mask, other_first, other_last, other_mask):
+    """두 일정이 모두 열리는 첫 날짜, 없으면 None (기간의 겹치는 구간에서 7일만 확인)"""
+    lo, hi = max(first, other_first), min(last, other_last)
+    for offset in range(min(7, (hi - lo).days + 1)):
+        day = lo + timedelta(days=offset)
+        if weekday_mask & other_mask & (1 << day.weekday()):
+            return day
+    return None
+
+
+def find_participant_conflicts(
+    user_ids, date, start, end, weekday_mask=0, until=None, exclude=None
+):
+    """
+    예약자나 동반 참석자로 같은 시간대에 이미 참석하는 일정이 있는 참가자 목록
+    참가자 수와 관계없이 예약과 동반 참석자 연결 테이블을 한 번의 query로 조회한다.
+    [{"user": user_id, "reservation": id, "date": 겹치는 첫 날짜, "start": ..., "end": ...}]
+    """
+    user_ids = set(user_ids)
+    first = date
+    last = (until or Date.max) if weekday_mask else date
+    weekday_mask = weekday_mask or 1 << date.weekday()
+
+    reservations = Reservation.objects.filter(
+        Q(booker_id__in=user_ids) | Q(companion__in=user_ids),
+        start__lt=end,
+        end__gt=start,
+        date__lte=last,
+    ).filter(
+        Q(is_scheduled=False, date__gte=first)
+        | (
+            Q(is_scheduled=True)
+            & (Q(schedule_daedline__isnull=True) | Q(schedule_daedline__gte=first))
+        )
+    )
+    if exclude is not None:
+        reservations = reservations.exclude(id=exclude)
+    if first == last:
+        # 단일 일정이면 해당 날짜만 취소된 반복 예약은 제외
+        reservations = reservations.annotate(
+            is_cancelled=Exists(
+                CancelledOccurrence.objects.filter(reservation=OuterRef("pk"), date=date)
+            )
+        ).filter(is_cancelled=False)
+
+    rows = reservations.order_by("id").values_list(
+        "id",
+        "booker_id",
+        "companion",
+        "is_scheduled",
+        "weekday_mask",
+        "date",
+        "schedule_daedline",
+        "start",
+        "end",
+    )
+
+    conflicts = {}
+    for id, booker_id, companion_id, is_scheduled, mask, other_first, deadline, other_start, other_end in rows:
+        if is_scheduled:
+            other_last = deadline or Date.max
+        else:
+            other_last, mask = other_first, 1 << other_first.weekday()
+        common_date = get_first_common_date(first, last, weekday_mask, other_first, other_last, mask)
+        if common_date is None:
+            continue
+
+        for user_id in {booker_id, companion_id} & user_ids:
+            conflicts[user_id, id] = {
+                "user": user_id,
+                "reservation": id,
+                "date": common_date,
+                "start": other_start,
+                "end": other_end,
+            }
+    return list(conflicts.values())
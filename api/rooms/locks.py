@@ -0,0 +1,69 @@
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from .models import ReservationLock, Room
+
+
+# 회의실 행에 거는 공유 lock (sqlite는 쓰기 transaction이 이미 직렬화되므로 생략)
+SHARED_LOCK_CLAUSES = {
+    "mysql": "LOCK IN SHARE MODE",
+    "postgresql": "FOR SHARE",
+}
+
+
+def lock_room_shared(room_id):
+    clause = SHARED_LOCK_CLAUSES.get(connection.vendor)
+    if clause is None:
+        return
+    table = connection.ops.quote_name(Room._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT id FROM {table} WHERE id = %s {clause}", [room_id])
+
+
+def lock_participants(user_ids):
+    """
+    예약자와 동반 참석자 행에 id 순서대로 배타 lock을 잡는다.
+
+    회의실 lock만으로는 다른 회의실의 동시 예약이 같은 참석자를 중복 예약할 수 있으므로
+    참석자 충돌 검사 전에 호출한다. 항상 id 순서로 잡으므로 참석자가 겹치는 예약끼리 deadlock이 생기지 않는다.
+    """
+    list(
+        get_user_model().objects.select_for_update()
+        .filter(id__in=user_ids)
+        .order_by("id")
+        .values_list("id")
+    )
+
+
+@contextmanager
+def lock_schedule(room_id, date, is_scheduled=False):
+    """
+    예약 충돌 검사와 저장을 하나의 transaction에서 회의실 단위 lock을 잡고 실행한다.
+
+    단일 예약은 회의실 행에 공유 lock, (회의실, 날짜) lock 행에 배타 lock을 잡아
+    같은 날짜의 예약끼리만 기다린다. 반복 예약은 여러 날짜에 걸치므로 회의실 행에 배타 lock을 잡아
+    해당 회의실의 다른 쓰기가 끝나기를 기다린다. 다른 회의실의 예약과는 서로 기다리지 않는다.
+    """
+    if room_id is None:
+        with transaction.atomic():
+            yield
+        return
+
+    if not is_scheduled:
+        # lock 행은 transaction 밖에서 미리 만들어 첫 query가 lock을 잡는 조회가 되도록 한다.
+        # (MySQL REPEATABLE READ에서 lock을 기다리기 전에 snapshot이 만들어지지 않게)
+        ReservationLock.objects.get_or_create(room_id=room_id, date=date)
+
+    with transaction.atomic():
+        if is_scheduled:
+            list(Room.objects.select_for_update().filter(id=room_id).values_list("id"))
+        else:
+            lock_room_shared(room_id)
+            list(
+                ReservationLock.objects.select_for_update()
+                .filter(room_id=room_id, date=date)
+                .values_list("id")
+            )
+        yield
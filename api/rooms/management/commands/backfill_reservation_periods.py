@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from rooms.models import Reservation, get_period
+from rooms.recurrences import get_schedule_weekday_mask
+
+
+class Command(BaseCommand):
+    help = "예약의 starts_at, ends_at과 반복 예약의 weekday_mask를 채움"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--all", action="store_true", help="이미 채워진 예약도 다시 계산"
+        )
+
+    def handle(self, *args, **options):
+        reservations = Reservation.objects.order_by("id").only(
+            "id", "date", "start", "end", "is_scheduled", "day"
+        )
+        if not options["all"]:
+            # weekday_mask가 추가되기 전에 저장된 반복 예약은 0으로 남아 충돌 검사에서 빠진다.
+            reservations = reservations.filter(
+                Q(starts_at__isnull=True, date__isnull=False)
+                | Q(is_scheduled=True, weekday_mask=0)
+            )
+
+        last_id, updated = 0, 0
+        while True:
+            batch = list(reservations.filter(id__gt=last_id)[: options["batch_size"]])
+            if not batch:
+                break
+
+            for reservation in batch:
+                reservation.starts_at, reservation.ends_at = get_period(
+                    reservation.date, reservation.start, reservation.end
+                )
+                reservation.weekday_mask = 0
+                if reservation.is_scheduled:
+                    reservation.weekday_mask = get_schedule_weekday_mask(
+                        reservation.day, reservation.date
+                    )
+            Reservation.objects.bulk_update(batch, ["starts_at", "ends_at", "weekday_mask"])
+            last_id, updated = batch[-1].id, updated + len(batch)
+
+        self.stdout.write(f"updated {updated} reservations")
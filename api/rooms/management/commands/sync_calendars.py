@@ -0,0 +1,19 @@
+from common.outbox import OutboxWorkerCommand
+from rooms.calendar_sync import DONE, process_pending_tasks
+
+
+class Command(OutboxWorkerCommand):
+    help = "구글 캘린더 동기화 작업(outbox)을 일괄 처리"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--workers", type=int, default=None, help="구글 API 요청을 동시에 보낼 thread 수"
+        )
+
+    def process(self, options):
+        return process_pending_tasks(options["batch_size"], options["workers"])
+
+    def report(self, tasks):
+        done = sum(task.status == DONE for task in tasks)
+        return f"processed {len(tasks)} tasks ({done} done)"
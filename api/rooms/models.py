@@ -3,6 +3,18 @@ from users.models import User
 from django.utils.translation import gettext_lazy as _
 import datetime
 
+from .recurrences import get_schedule_weekday_mask
+
+# 시작 시간 전후로 위치 인증(출석)이 가능한 시간
+ATTENDANCE_WINDOW = datetime.timedelta(minutes=10)
+
+
+def get_period(date, start, end):
+    """예약 날짜와 시작, 종료 시간을 합친 (starts_at, ends_at)"""
+    if date is None:
+        return None, None
+    return datetime.datetime.combine(date, start), datetime.datetime.combine(date, end)
+
 
 class RoomImages(models.Model):
     id = models.BigAutoField(primary_key=True, auto_created=True)
@@ -25,6 +37,7 @@ class Reservation(models.Model):
     id = models.AutoField(primary_key=True)
     is_scheduled = models.BooleanField(default=False)
     day = models.JSONField(default=dict)
+    weekday_mask = models.PositiveSmallIntegerField(default=0)
     schedule_daedline = models.DateField(null=True, blank=True)
     date = models.DateField(default=datetime.date.today, null=True, blank=True)
     start = models.TimeField(default=datetime.time)
@@ -32,12 +45,90 @@ class Reservation(models.Model):
     reason = models.CharField(max_length=63, null=True, blank=True)
     status = models.IntegerField(choices=STATUS_CHOICE, default=0)
     is_attended = models.BooleanField(default=False)
+    # 출석 가능 시간이 지나 노쇼 집계에 반영되었는지 여부
+    noshow_recorded = models.BooleanField(default=False)
+    # date + start, date + end (반복 예약은 첫 일정 기준), 시간 범위 조회에 사용
+    starts_at = models.DateTimeField(null=True, editable=False)
+    ends_at = models.DateTimeField(null=True, editable=False)
     booker = models.ForeignKey(User, related_name="booker", on_delete=models.CASCADE)
     room = models.ForeignKey(
         Room, related_name="room", on_delete=models.SET_NULL, null=True
     )
     companion = models.ManyToManyField(User, related_name="companion", blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["room", "date", "start", "end"], name="reservation_room_slot_idx"
+            ),
+            models.Index(
+                fields=["noshow_recorded", "starts_at"],
+                name="reservation_noshow_idx",
+            ),
+            models.Index(
+                fields=["room", "starts_at", "ends_at"], name="reservation_period_idx"
+            ),
+            models.Index(fields=["date", "start", "id"], name="reservation_keyset_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_slot = instance.get_slot()
+        instance._loaded_noshow_booker = instance.get_noshow_booker()
+        return instance
+
+    def get_noshow_booker(self):
+        """노쇼로 집계된 예약이면 booker id (users.noshows)"""
+        if self.__dict__.get("noshow_recorded") and self.__dict__.get("is_attended") is False:
+            return self.__dict__.get("booker_id")
+        return None
+
+    def get_slot(self):
+        return (
+            self.__dict__.get("room_id"),
+            self.__dict__.get("date"),
+            self.__dict__.get("is_scheduled"),
+        )
+
+    def save(self, *args, **kwargs):
+        self.weekday_mask = 0
+        if self.is_scheduled:
+            self.weekday_mask = get_schedule_weekday_mask(self.day, self.date)
+        self.starts_at, self.ends_at = get_period(self.date, self.start, self.end)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"date", "start", "end"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "starts_at", "ends_at"}
+        super().save(*args, **kwargs)
+
+
+class ReservationLock(models.Model):
+    """회의실, 날짜별 단일 예약 생성을 직렬화하기 위한 lock 행 (rooms.locks)"""
+
+    id = models.BigAutoField(primary_key=True)
+    room = models.ForeignKey(Room, on_delete=models.CASCADE)
+    date = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["room", "date"], name="reservation_lock_unique"),
+        ]
+
+
+class CancelledOccurrence(models.Model):
+    id = models.AutoField(primary_key=True)
+    reservation = models.ForeignKey(
+        Reservation, related_name="cancelled_occurrences", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["reservation", "date"], name="cancelled_occurrence_unique"
+            ),
+        ]
+
 
 class GoogleCalenderLog(models.Model):
     id = models.AutoField(primary_key=True)
@@ -46,3 +137,41 @@ class GoogleCalenderLog(models.Model):
     reservation = models.ForeignKey(
         Reservation, related_name="reservation", on_delete=models.CASCADE
     )
+    is_shared = models.BooleanField(default=False)
+
+
+class CalendarSyncTask(models.Model):
+    ACTION_CHOICE = (
+        ("create", "create event"),
+        ("cancel_occurrence", "cancel event occurrence"),
+        ("delete", "delete event"),
+    )
+    STATUS_CHOICE = (
+        (0, "pending"),
+        (1, "done"),
+        (2, "failed"),
+    )
+    id = models.BigAutoField(primary_key=True)
+    action = models.CharField(max_length=20, choices=ACTION_CHOICE)
+    owner = models.ForeignKey(
+        User, related_name="calendar_sync_tasks", on_delete=models.CASCADE
+    )
+    reservation = models.ForeignKey(
+        Reservation,
+        related_name="calendar_sync_tasks",
+        on_delete=models.SET_NULL,
+        null=True,
+    )
+    payload = models.JSONField(default=dict)
+    status = models.IntegerField(choices=STATUS_CHOICE, default=0)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=datetime.datetime.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="calendar_sync_pending_idx"
+            ),
+        ]
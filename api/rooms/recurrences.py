@@ -0,0 +1,84 @@
+import re
+from datetime import timedelta
+
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+KOREAN_WEEKDAYS = ("월", "화", "수", "목", "금", "토", "일")
+
+
+def parse_weekday(value):
+    """
+    요일 표현을 date.weekday() 기준의 정수(월요일 0 ~ 일요일 6)로 변환
+    ex) 0, "mon", "Monday", "월", "월요일"
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if 0 <= value < len(WEEKDAYS) else None
+    if not isinstance(value, str):
+        return None
+
+    value = value.strip().lower()
+    if value.isdigit():
+        return parse_weekday(int(value))
+    if value[:1] in KOREAN_WEEKDAYS:
+        return KOREAN_WEEKDAYS.index(value[:1])
+    if value[:3] in WEEKDAYS:
+        return WEEKDAYS.index(value[:3])
+    return None
+
+
+def get_weekday_mask(day):
+    """
+    Reservation.day(JSONField)의 반복 요일을 bitmask로 변환, 월요일이 최하위 bit
+    ex) ["mon", "wed"], {"월": true, "수": true}, "월,수" -> 0b0000101
+    """
+    if isinstance(day, dict):
+        values = [key for key, selected in day.items() if selected]
+    elif isinstance(day, (list, tuple)):
+        values = day
+    elif isinstance(day, str):
+        values = [value for value in re.split(r"[\s,/]+", day) if value]
+    else:
+        values = []
+
+    mask = 0
+    for value in values:
+        weekday = parse_weekday(value)
+        if weekday is not None:
+            mask |= 1 << weekday
+    return mask
+
+
+def get_schedule_weekday_mask(day, date):
+    # 반복 요일을 해석할 수 없으면 시작 날짜의 요일마다 반복
+    mask = get_weekday_mask(day)
+    if not mask and date is not None:
+        mask = 1 << date.weekday()
+    return mask
+
+
+def get_weekdays(mask):
+    return [weekday for weekday in range(len(WEEKDAYS)) if mask >> weekday & 1]
+
+
+def iter_occurrences(reservation, since, until, cancelled=()):
+    """
+    [since, until] 기간 안에 있는 예약의 발생 날짜를 순서대로 생성
+    반복 예약이 아니면 예약 날짜 하나만 생성하며, cancelled에 포함된 날짜는 건너뛴다.
+    """
+    if not reservation.is_scheduled:
+        if reservation.date is not None and since <= reservation.date <= until:
+            yield reservation.date
+        return
+
+    first = max(since, reservation.date) if reservation.date else since
+    last = min(until, reservation.schedule_daedline) if reservation.schedule_daedline else until
+    if not reservation.weekday_mask:
+        return
+
+    current = first
+    while current <= last:
+        if reservation.weekday_mask >> current.weekday() & 1 and current not in cancelled:
+            yield current
+        current += timedelta(days=1)
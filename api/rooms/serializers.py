@@ -1,13 +1,14 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from .models import Reservation, Room, RoomImages
 
 from users.models import User
-import logging, json
+import json
 from PIL import Image
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+from common.logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class RoomImageSerializer(serializers.ModelSerializer):
@@ -37,7 +38,7 @@ class RoomSerializer(serializers.ModelSerializer):
             room_images = RoomImages.objects.create(image=image)
             data["images"] = room_images
         except ValueError:
-            logging.warning("이미지 없음")
+            logger.info("room_image_missing")
 
         room = Room.objects.create(**data)
         return room
@@ -53,7 +54,7 @@ class RoomSerializer(serializers.ModelSerializer):
             room_images = RoomImages.objects.create(image=image)
             data["images"] = room_images
         except:
-            logging.warning("이미지 없음")
+            logger.info("room_image_missing")
 
         room = instance.update(**data)
         return room
@@ -72,15 +73,73 @@ class BookerSerialzier(serializers.ModelSerializer):
 class CompanionSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = "__all__"
+        fields = ["id", "user_no", "name", "email", "user_type", "department"]
+
+
+class BulkPrimaryKeyRelatedField(serializers.ManyRelatedField):
+    """id 목록 전체를 IN query 한 번으로 검증하고 없는 id를 모두 알려주는 many 관계 field"""
+
+    default_error_messages = {
+        "does_not_exist": _('Invalid pk "{pk_value}" - object does not exist.'),
+        "incorrect_type": _("Incorrect type. Expected pk value, received {data_type}."),
+    }
+
+    def __init__(self, queryset, **kwargs):
+        kwargs["child_relation"] = serializers.PrimaryKeyRelatedField(queryset=queryset)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        pks = list(dict.fromkeys(self.to_pk(pk) for pk in data))
+        instances = self.child_relation.get_queryset().in_bulk(pks)
+        missing = [pk for pk in pks if pk not in instances]
+        if missing:
+            message = self.error_messages["does_not_exist"]
+            raise serializers.ValidationError(
+                [message.format(pk_value=pk) for pk in missing], code="does_not_exist"
+            )
+        return [instances[pk] for pk in pks]
+
+    def to_pk(self, data):
+        # bool과 1.9 같이 정수가 아닌 값이 int()로 바뀌어 다른 id로 검증되지 않도록 거른다.
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            pk = int(data)
+            if not isinstance(data, str) and pk != data:
+                raise ValueError
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        return pk
 
 
 class ReservationSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
+    companion = BulkPrimaryKeyRelatedField(
+        queryset=User.objects.only("id"), required=False
+    )
 
     class Meta:
         model = Reservation
         fields = "__all__"
+        read_only_fields = ["weekday_mask", "noshow_recorded"]
+        # 충돌 검사와 lock이 날짜 단위이므로 날짜 없는 예약은 받지 않는다.
+        extra_kwargs = {"date": {"required": True, "allow_null": False}}
+
+    def create(self, validated_data):
+        companions = validated_data.pop("companion", [])
+        reservation = super().create(validated_data)
+
+        # 동반 참석자 연결 행을 한 번의 insert로 생성
+        Companion = Reservation.companion.through
+        Companion.objects.bulk_create(
+            [Companion(reservation=reservation, user=user) for user in companions]
+        )
+        return reservation
 
 
 class MyReservationSerializer(serializers.ModelSerializer):
@@ -92,3 +151,4 @@ class MyReservationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reservation
         fields = "__all__"
+        read_only_fields = ["weekday_mask", "noshow_recorded"]
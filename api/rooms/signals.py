@@ -0,0 +1,43 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .availability import invalidate_availability
+from .models import CancelledOccurrence, Reservation
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalidate_reservation_caches(sender, instance, **kwargs):
+    # 다른 회의실로 옮겨진 예약은 이전 회의실의 cache도 비운다.
+    room_ids = {instance.room_id}
+    loaded_slot = getattr(instance, "_loaded_slot", None)
+    if loaded_slot is not None:
+        room_ids.add(loaded_slot[0])
+    instance._loaded_slot = instance.get_slot()
+
+    def invalidate():
+        for room_id in room_ids:
+            invalidate_availability(room_id)
+
+    # commit 전에 다른 요청이 이전 데이터로 cache를 다시 채웠을 수 있으므로 commit 후 한 번 더 비운다.
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=CancelledOccurrence)
+@receiver(post_delete, sender=CancelledOccurrence)
+def invalidate_cancelled_occurrence_caches(sender, instance, **kwargs):
+    # 예약이 함께 삭제되는 중일 수 있으므로 instance.reservation 대신 room_id만 조회
+    room_ids = list(
+        Reservation.objects.filter(id=instance.reservation_id).values_list(
+            "room_id", flat=True
+        )
+    )
+
+    def invalidate():
+        for room_id in room_ids:
+            invalidate_availability(room_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
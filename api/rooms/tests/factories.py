@@ -0,0 +1,26 @@
+import datetime
+
+from factory.django import DjangoModelFactory
+from factory import sequence, SubFactory
+
+from users.tests.factories import UserFactory
+
+
+class RoomFactory(DjangoModelFactory):
+    class Meta:
+        model = 'rooms.Room'
+
+    name = sequence(lambda n: f'회의실{n}')
+    discription = '회의실 설명'
+
+
+class ReservationFactory(DjangoModelFactory):
+    class Meta:
+        model = 'rooms.Reservation'
+
+    date = datetime.date(2023, 6, 1)
+    start = datetime.time(10)
+    end = datetime.time(11)
+    reason = '회의'
+    booker = SubFactory(UserFactory)
+    room = SubFactory(RoomFactory)
@@ -0,0 +1,272 @@
+import datetime
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+
+from rest_framework.test import APITestCase
+from rest_framework.status import HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
+
+from common.fakes import FakeGoogleServerMixin
+from users.models import GoogleAccount
+from users.tests.factories import UserFactory, UserTypeFactory
+from .factories import RoomFactory, ReservationFactory
+from ..calendar_sync import (
+    DONE,
+    FAILED,
+    PENDING,
+    claim_tasks,
+    enqueue_event_creations,
+    process_pending_tasks,
+    process_task,
+    save_results,
+)
+from ..availability import get_availability
+from ..conflicts import find_schedule_conflicts
+from ..models import CalendarSyncTask, CancelledOccurrence, GoogleCalenderLog, Reservation
+
+
+@override_settings(GOOGLE_CALENDAR_SYNC_MODE='per_participant')
+class CalendarSyncTestCase(FakeGoogleServerMixin, APITestCase):
+    url = '/api/rooms/reservations'
+
+    @classmethod
+    def setUpTestData(cls):
+        user_type = UserTypeFactory()
+        cls.booker = UserFactory(user_type=user_type)
+        cls.companion = UserFactory(user_type=user_type)
+        cls.unlinked_companion = UserFactory(user_type=user_type)
+        for user in (cls.booker, cls.companion):
+            GoogleAccount.objects.create(user=user, access_token='access_token', refresh_token='refresh_token')
+        cls.room = RoomFactory()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+        self.client.force_authenticate(user=self.booker)
+
+    def __create_reservation(self):
+        request_data = {
+            'booker': self.booker.id,
+            'room': self.room.id,
+            'date': '2023-06-01',
+            'start': '10:00:00',
+            'end': '11:00:00',
+            'reason': '회의',
+            'companion': [self.companion.id, self.unlinked_companion.id],
+        }
+        response = self.client.post(self.url, request_data, format='json')
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        return Reservation.objects.get(room=self.room, date=datetime.date(2023, 6, 1))
+
+    def test_create_only_enqueues_tasks(self):
+        reservation = self.__create_reservation()
+        tasks = CalendarSyncTask.objects.filter(reservation=reservation)
+
+        self.assertListEqual(self.server.requests, [])
+        self.assertSetEqual({task.owner_id for task in tasks}, {self.booker.id, self.companion.id})
+        self.assertTrue(all(task.status == PENDING for task in tasks))
+        self.assertEqual(tasks[0].payload['start_datetime'], '2023-06-01T10:00:00+09:00')
+
+    def test_worker_creates_and_deletes_events(self):
+        reservation = self.__create_reservation()
+        call_command('sync_calendars', '--once', stdout=StringIO())
+
+        self.assertEqual(len(self.server.requests_to('POST', '/calendar/v3/calendars/primary/events')), 2)
+        self.assertEqual(GoogleCalenderLog.objects.filter(reservation=reservation).count(), 2)
+        self.assertTrue(all(task.status == DONE for task in CalendarSyncTask.objects.all()))
+
+        response = self.client.delete(f'/api/rooms/my-reservations/{reservation.id}')
+        self.assertEqual(response.status_code, HTTP_204_NO_CONTENT)
+        self.assertEqual(len(self.server.requests_to('DELETE', '/calendar/v3/calendars/primary/events')), 0)
+
+        call_command('sync_calendars', '--once', stdout=StringIO())
+        self.assertEqual(len(self.server.requests_to('DELETE', '/calendar/v3/calendars/primary/events')), 2)
+
+    def test_failed_task_is_retried_with_backoff(self):
+        self.__create_reservation()
+        self.server.fail_next(500)
+
+        tasks = process_pending_tasks()
+        failed = [task for task in tasks if task.status == PENDING]
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed[0].attempts, 1)
+        self.assertGreater(failed[0].next_attempt_at, datetime.datetime.now())
+        self.assertListEqual(process_pending_tasks(), [])
+
+        CalendarSyncTask.objects.filter(id=failed[0].id).update(next_attempt_at=datetime.datetime.now())
+        self.assertEqual(process_pending_tasks()[0].status, DONE)
+
+    @override_settings(CALENDAR_SYNC_MAX_ATTEMPTS=1)
+    def test_task_fails_after_max_attempts(self):
+        self.__create_reservation()
+        self.server.fail_next(500, 500, 500, 500)
+
+        tasks = process_pending_tasks()
+        self.assertTrue(all(task.status == FAILED for task in tasks))
+
+
+@override_settings(GOOGLE_CALENDAR_SYNC_MODE='shared')
+class SharedCalendarSyncTestCase(FakeGoogleServerMixin, APITestCase):
+    events_path = '/calendar/v3/calendars/primary/events'
+
+    @classmethod
+    def setUpTestData(cls):
+        user_type = UserTypeFactory()
+        cls.booker = UserFactory(user_type=user_type)
+        cls.companions = UserFactory.create_batch(10, user_type=user_type)
+        GoogleAccount.objects.create(user=cls.booker, access_token='access_token', refresh_token='refresh_token')
+        cls.room = RoomFactory()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+        self.client.force_authenticate(user=self.booker)
+
+    def test_single_event_with_attendees(self):
+        request_data = {
+            'booker': self.booker.id,
+            'room': self.room.id,
+            'date': '2023-06-01',
+            'start': '10:00:00',
+            'end': '11:00:00',
+            'reason': '회의',
+            'companion': [companion.id for companion in self.companions],
+        }
+        self.client.post('/api/rooms/reservations', request_data, format='json')
+        reservation = Reservation.objects.get(room=self.room)
+        process_pending_tasks()
+
+        inserts = self.server.requests_to('POST', self.events_path)
+        self.assertEqual(len(inserts), 1)
+        self.assertSetEqual(
+            {attendee['email'] for attendee in inserts[0]['body']['attendees']},
+            {companion.email for companion in self.companions},
+        )
+        self.assertDictEqual(inserts[0]['query'], {'sendUpdates': ['all']})
+        self.assertTrue(GoogleCalenderLog.objects.get(reservation=reservation).is_shared)
+
+        self.client.delete(f'/api/rooms/my-reservations/{reservation.id}')
+        process_pending_tasks()
+        deletes = self.server.requests_to('DELETE', self.events_path)
+        self.assertEqual(len(deletes), 1)
+        self.assertDictEqual(deletes[0]['query'], {'sendUpdates': ['all']})
+
+
+@override_settings(GOOGLE_CALENDAR_SYNC_MODE='per_participant')
+class CalendarSyncFanOutTestCase(FakeGoogleServerMixin, APITestCase):
+    events_path = '/calendar/v3/calendars/primary/events'
+
+    @classmethod
+    def setUpTestData(cls):
+        user_type = UserTypeFactory()
+        cls.room = RoomFactory()
+        cls.booker = UserFactory(user_type=user_type)
+        cls.companions = UserFactory.create_batch(12, user_type=user_type)
+        expires_at = datetime.datetime.now() + datetime.timedelta(hours=1)
+        for user in [cls.booker] + cls.companions:
+            GoogleAccount.objects.create(
+                user=user, access_token='access_token', refresh_token='refresh_token', access_token_expires_at=expires_at
+            )
+
+    def __create_reservation(self, companions):
+        reservation = ReservationFactory(booker=self.booker, room=self.room)
+        reservation.companion.set(companions)
+        enqueue_event_creations(reservation)
+        return reservation
+
+    def test_query_count_does_not_grow_with_participants(self):
+        reservation = self.__create_reservation(self.companions[:2])
+        with self.assertNumQueries(7):
+            process_pending_tasks(workers=4)
+
+        reservation = self.__create_reservation(self.companions)
+        with self.assertNumQueries(7):
+            tasks = process_pending_tasks(workers=4)
+
+        self.assertEqual(len(tasks), 13)
+        self.assertEqual(GoogleCalenderLog.objects.filter(reservation=reservation).count(), 13)
+        self.assertEqual(len(self.server.requests_to('POST', self.events_path)), 16)
+
+    def test_event_created_for_deleted_reservation_is_cleaned_up(self):
+        reservation = self.__create_reservation(self.companions[:1])
+        tasks = claim_tasks(10)
+        logs = [process_task(task) for task in tasks]
+        reservation.delete()
+
+        save_results(tasks, logs)
+        process_pending_tasks()
+
+        self.assertFalse(GoogleCalenderLog.objects.exists())
+        self.assertEqual(len(self.server.requests_to('DELETE', self.events_path)), 2)
+
+
+@override_settings(GOOGLE_CALENDAR_SYNC_MODE='shared')
+class RecurringCalendarSyncTestCase(FakeGoogleServerMixin, APITestCase):
+    events_path = '/calendar/v3/calendars/primary/events'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.booker = UserFactory(user_type=UserTypeFactory())
+        GoogleAccount.objects.create(user=cls.booker, access_token='access_token', refresh_token='refresh_token')
+        cls.room = RoomFactory()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+        self.client.force_authenticate(user=self.booker)
+
+        # 5/31(수) ~ 6/30 매주 월, 목 10:00 ~ 11:00
+        request_data = {
+            'booker': self.booker.id,
+            'room': self.room.id,
+            'is_scheduled': True,
+            'day': ['mon', 'thu'],
+            'date': '2023-05-31',
+            'schedule_daedline': '2023-06-30',
+            'start': '10:00:00',
+            'end': '11:00:00',
+            'reason': '정기 회의',
+        }
+        self.client.post('/api/rooms/reservations', request_data, format='json')
+        self.reservation = Reservation.objects.get(room=self.room)
+        process_pending_tasks()
+
+    def test_series_is_synced_as_single_recurring_event(self):
+        inserts = self.server.requests_to('POST', self.events_path)
+
+        self.assertEqual(len(inserts), 1)
+        self.assertListEqual(inserts[0]['body']['recurrence'], ['RRULE:FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20230630T145959Z'])
+        self.assertDictEqual(
+            inserts[0]['body']['start'], {'dateTime': '2023-06-01T10:00:00+09:00', 'timeZone': 'Asia/Seoul'}
+        )
+
+    def test_cancel_occurrence(self):
+        event_id = GoogleCalenderLog.objects.get(reservation=self.reservation).event_id
+        url = f'/api/rooms/my-reservations/{self.reservation.id}/occurrences/2023-06-05'
+
+        self.assertTrue(find_schedule_conflicts(self.room.id, datetime.date(2023, 6, 5), datetime.time(10), datetime.time(11)))
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, HTTP_204_NO_CONTENT)
+        process_pending_tasks()
+
+        patches = self.server.requests_to('PATCH', self.events_path)
+        self.assertEqual(len(patches), 1)
+        self.assertEqual(patches[0]['path'], f'{self.events_path}/{event_id}_20230605T010000Z')
+        self.assertDictEqual(patches[0]['body'], {'status': 'cancelled'})
+
+        self.assertListEqual(
+            find_schedule_conflicts(self.room.id, datetime.date(2023, 6, 5), datetime.time(10), datetime.time(11)), []
+        )
+        availability = get_availability([self.room.id], datetime.date(2023, 6, 5), datetime.date(2023, 6, 8))
+        self.assertEqual(len(set(availability[str(self.room.id)].values())), 2)
+
+    def test_cancel_date_without_occurrence(self):
+        response = self.client.delete(f'/api/rooms/my-reservations/{self.reservation.id}/occurrences/2023-06-06')
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertFalse(CancelledOccurrence.objects.exists())
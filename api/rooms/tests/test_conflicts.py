@@ -0,0 +1,209 @@
+import datetime
+
+from rest_framework.status import HTTP_400_BAD_REQUEST
+from rest_framework.test import APITestCase
+
+from users.tests.factories import UserFactory, UserTypeFactory
+from .factories import RoomFactory, ReservationFactory
+from ..conflicts import find_participant_conflicts, find_schedule_conflicts
+from ..models import CancelledOccurrence, ReservationLock
+
+
+DATE = datetime.date(2023, 6, 1)
+
+
+def t(hour, minute=0):
+    return datetime.time(hour, minute)
+
+
+class SingleReservationConflictTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.booker = UserFactory(user_type=UserTypeFactory())
+        cls.room = RoomFactory()
+        cls.other_room = RoomFactory()
+
+    def test_conflicts_with_nested_intervals(self):
+        long = ReservationFactory(booker=self.booker, room=self.room, date=DATE, start=t(9), end=t(18))
+        short = ReservationFactory(booker=self.booker, room=self.room, date=DATE, start=t(10), end=t(11))
+
+        self.assertListEqual(find_schedule_conflicts(self.room.id, DATE, t(12), t(13)), [long.id])
+        self.assertListEqual(find_schedule_conflicts(self.room.id, DATE, t(10, 30), t(12)), [long.id, short.id])
+        self.assertListEqual(find_schedule_conflicts(self.room.id, DATE, t(18), t(19)), [])
+        self.assertListEqual(find_schedule_conflicts(self.room.id, DATE + datetime.timedelta(days=1), t(10), t(11)), [])
+
+    def test_conflicts_are_scoped_by_room(self):
+        reservation = ReservationFactory(booker=self.booker, room=self.other_room, date=DATE, start=t(10), end=t(11))
+
+        self.assertListEqual(find_schedule_conflicts(self.room.id, DATE, t(10), t(11)), [])
+        self.assertListEqual(find_schedule_conflicts(self.other_room.id, DATE, t(10), t(11)), [reservation.id])
+
+
+class RecurringSeriesConflictTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.booker = UserFactory(user_type=UserTypeFactory())
+        cls.room = RoomFactory()
+        # 6/1(목) ~ 6/30 매주 월, 목 10:00 ~ 11:00
+        cls.series = ReservationFactory(
+            booker=cls.booker,
+            room=cls.room,
+            is_scheduled=True,
+            day=['mon', 'thu'],
+            date=DATE,
+            schedule_daedline=datetime.date(2023, 6, 30),
+            start=t(10),
+            end=t(11),
+        )
+
+    def test_weekday_mask_is_maintained_on_save(self):
+        self.assertEqual(self.series.weekday_mask, 0b0001001)
+
+    def test_single_reservation_against_series(self):
+        monday = datetime.date(2023, 6, 12)
+        tuesday = datetime.date(2023, 6, 13)
+
+        self.assertListEqual(find_schedule_conflicts(self.room.id, monday, t(10, 30), t(12)), [self.series.id])
+        self.assertListEqual(find_schedule_conflicts(self.room.id, monday, t(11), t(12)), [])
+        self.assertListEqual(find_schedule_conflicts(self.room.id, tuesday, t(10), t(11)), [])
+        self.assertListEqual(find_schedule_conflicts(self.room.id, datetime.date(2023, 7, 3), t(10), t(11)), [])
+
+    def test_series_against_series(self):
+        tuesday, wednesday, thursday = (datetime.date(2023, 6, day) for day in (20, 21, 22))
+        thursday_mask = 1 << thursday.weekday()
+
+        self.assertListEqual(
+            find_schedule_conflicts(self.room.id, tuesday, t(10), t(11), weekday_mask=0b0000110), []
+        )
+        self.assertListEqual(
+            find_schedule_conflicts(self.room.id, tuesday, t(10), t(11), weekday_mask=thursday_mask),
+            [self.series.id],
+        )
+        # 기간이 겹치지만 겹치는 기간 안에 목요일이 없는 경우
+        self.assertListEqual(
+            find_schedule_conflicts(
+                self.room.id, datetime.date(2023, 6, 16), t(10), t(11), weekday_mask=thursday_mask, until=wednesday
+            ),
+            [],
+        )
+
+    def test_series_against_single_reservations(self):
+        single = ReservationFactory(
+            booker=self.booker, room=self.room, date=datetime.date(2023, 7, 4), start=t(15), end=t(16)
+        )
+
+        self.assertListEqual(
+            find_schedule_conflicts(
+                self.room.id, datetime.date(2023, 7, 1), t(15), t(17), weekday_mask=0b0000010
+            ),
+            [single.id],
+        )
+        self.assertListEqual(
+            find_schedule_conflicts(
+                self.room.id, datetime.date(2023, 7, 1), t(15), t(17), weekday_mask=0b0000100
+            ),
+            [],
+        )
+
+    def test_deleted_series_is_not_a_conflict(self):
+        monday = datetime.date(2023, 6, 12)
+        self.assertListEqual(find_schedule_conflicts(self.room.id, monday, t(10), t(11)), [self.series.id])
+
+        self.series.delete()
+        self.assertListEqual(find_schedule_conflicts(self.room.id, monday, t(10), t(11)), [])
+
+
+class ParticipantConflictTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user_type = UserTypeFactory()
+        cls.booker, cls.companion, cls.other_user, cls.free_user = UserFactory.create_batch(4, user_type=user_type)
+        cls.room, cls.other_room = RoomFactory.create_batch(2)
+        # 다른 회의실의 단일 예약 6/1(목) 10:00 ~ 11:00, other_user가 동반 참석
+        cls.single = ReservationFactory(booker=cls.booker, room=cls.other_room, date=DATE, start=t(10), end=t(11))
+        cls.single.companion.add(cls.other_user)
+        # 6/1 ~ 6/30 매주 월요일 14:00 ~ 15:00, companion이 동반 참석
+        cls.series = ReservationFactory(
+            booker=cls.other_user, room=cls.other_room, is_scheduled=True, day=['mon'], date=DATE,
+            schedule_daedline=datetime.date(2023, 6, 30), start=t(14), end=t(15),
+        )
+        cls.series.companion.add(cls.companion)
+
+    def __user_conflicts(self, user_ids, *args, **kwargs):
+        return sorted(
+            (conflict['user'], conflict['reservation'], conflict['date'])
+            for conflict in find_participant_conflicts(user_ids, *args, **kwargs)
+        )
+
+    def test_booker_and_companion_conflicts(self):
+        user_ids = [self.booker.id, self.other_user.id, self.free_user.id]
+
+        self.assertListEqual(
+            self.__user_conflicts(user_ids, DATE, t(10, 30), t(12)),
+            [(self.booker.id, self.single.id, DATE), (self.other_user.id, self.single.id, DATE)],
+        )
+        self.assertListEqual(self.__user_conflicts(user_ids, DATE, t(11), t(12)), [])
+
+    def test_single_against_series(self):
+        monday = datetime.date(2023, 6, 12)
+
+        self.assertListEqual(
+            self.__user_conflicts([self.companion.id], monday, t(14, 30), t(16)),
+            [(self.companion.id, self.series.id, monday)],
+        )
+        self.assertListEqual(self.__user_conflicts([self.companion.id], datetime.date(2023, 6, 13), t(14), t(15)), [])
+
+        CancelledOccurrence.objects.create(reservation=self.series, date=monday)
+        self.assertListEqual(self.__user_conflicts([self.companion.id], monday, t(14), t(15)), [])
+
+    def test_series_against_series_and_single(self):
+        thursday_mask = 1 << DATE.weekday()
+
+        # 매주 목요일 10:00 ~ 15:00 반복 예약은 6/1 단일 예약과 겹치고 월요일 반복 예약과는 겹치지 않음
+        self.assertListEqual(
+            self.__user_conflicts(
+                [self.booker.id, self.companion.id], DATE, t(10), t(15), weekday_mask=thursday_mask
+            ),
+            [(self.booker.id, self.single.id, DATE)],
+        )
+        self.assertListEqual(
+            self.__user_conflicts([self.companion.id], DATE, t(14), t(15), weekday_mask=0b0000001),
+            [(self.companion.id, self.series.id, datetime.date(2023, 6, 5))],
+        )
+
+    def test_query_count_does_not_depend_on_participants(self):
+        user_ids = [user.id for user in UserFactory.create_batch(20, user_type=self.booker.user_type)]
+
+        with self.assertNumQueries(1):
+            find_participant_conflicts([self.booker.id, *user_ids], DATE, t(10), t(11))
+
+    def test_create_returns_conflicts(self):
+        self.client.force_authenticate(user=self.free_user)
+        request_data = {
+            'booker': self.free_user.id,
+            'room': self.room.id,
+            'date': '2023-06-01',
+            'start': '10:30:00',
+            'end': '11:30:00',
+            'reason': '회의',
+            'companion': [self.other_user.id, self.companion.id],
+        }
+        response = self.client.post('/api/rooms/reservations', request_data, format='json')
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertListEqual(
+            response.json()['participant_conflicts'],
+            [{'user': self.other_user.id, 'reservation': self.single.id, 'date': '2023-06-01', 'start': '10:00:00', 'end': '11:00:00'}],
+        )
+
+    def test_create_rejects_null_date_before_locking(self):
+        self.client.force_authenticate(user=self.free_user)
+        request_data = {
+            'booker': self.free_user.id, 'room': self.room.id, 'date': None,
+            'start': '10:00:00', 'end': '11:00:00', 'reason': '회의',
+        }
+        response = self.client.post('/api/rooms/reservations', request_data, format='json')
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('date', response.json())
+        self.assertFalse(ReservationLock.objects.exists())
@@ -0,0 +1,102 @@
+import threading
+from unittest import skipIf
+
+from django.core.cache import cache
+from django.db import connection
+
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APIClient, APITransactionTestCase
+
+from .factories import RoomFactory
+from ..models import Reservation
+from users.tests.factories import UserFactory, UserTypeFactory
+
+
+CONCURRENT_REQUESTS = 8
+
+
+@skipIf(connection.vendor == 'sqlite', 'sqlite는 동시 쓰기 transaction을 지원하지 않음')
+class ConcurrentReservationTestCase(APITransactionTestCase):
+    url = '/api/rooms/reservations'
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory(user_type=UserTypeFactory())
+        self.rooms = RoomFactory.create_batch(2)
+
+    def __post_concurrently(self, requests_data):
+        barrier = threading.Barrier(len(requests_data))
+        status_codes = [None] * len(requests_data)
+
+        def post(index, request_data):
+            client = APIClient()
+            client.force_authenticate(user=self.user)
+            try:
+                barrier.wait()
+                status_codes[index] = client.post(self.url, request_data, format='json').status_code
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post, args=args) for args in enumerate(requests_data)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return status_codes
+
+    def __request_data(self, room, start, end, **kwargs):
+        return {
+            'booker': self.user.id, 'room': room.id, 'date': '2023-06-01',
+            'start': start, 'end': end, 'reason': '회의', **kwargs,
+        }
+
+    def test_same_slot_is_booked_once(self):
+        # 가용성 cache가 채워져 있어도 lock 안에서는 DB 기준으로 검사해야 한다.
+        self.client.force_authenticate(user=self.user)
+        self.client.get('/api/rooms/availability', {'start': '2023-06-01'})
+
+        requests_data = [
+            self.__request_data(self.rooms[0], f'10:{minute:02d}:00', f'11:{minute:02d}:00')
+            for minute in range(CONCURRENT_REQUESTS)
+        ]
+        status_codes = self.__post_concurrently(requests_data)
+
+        self.assertEqual(status_codes.count(HTTP_200_OK), 1)
+        self.assertEqual(Reservation.objects.filter(room=self.rooms[0]).count(), 1)
+
+    def test_series_and_single_are_not_double_booked(self):
+        requests_data = [
+            self.__request_data(
+                self.rooms[0], '10:00:00', '11:00:00', is_scheduled=True, day=['thu'], schedule_daedline='2023-06-30'
+            ),
+            *(
+                self.__request_data(self.rooms[0], '10:30:00', '11:30:00', date=f'2023-06-{day:02d}')
+                for day in (1, 8, 15, 22)
+            ),
+        ]
+        status_codes = self.__post_concurrently(requests_data)
+
+        self.assertEqual(status_codes.count(HTTP_200_OK), Reservation.objects.count())
+        if Reservation.objects.filter(is_scheduled=True).exists():
+            self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_other_rooms_are_booked_in_parallel(self):
+        requests_data = [
+            self.__request_data(room, '10:00:00', '11:00:00', booker=UserFactory(user_type=self.user.user_type).id)
+            for room in self.rooms
+        ]
+        status_codes = self.__post_concurrently(requests_data)
+
+        self.assertListEqual(status_codes, [HTTP_200_OK] * len(self.rooms))
+
+    def test_participant_is_not_double_booked_across_rooms(self):
+        companion = UserFactory(user_type=self.user.user_type)
+        requests_data = [
+            self.__request_data(room, '10:00:00', '11:00:00', booker=UserFactory(user_type=self.user.user_type).id,
+                                companion=[companion.id])
+            for room in self.rooms
+        ]
+        status_codes = self.__post_concurrently(requests_data)
+
+        self.assertEqual(status_codes.count(HTTP_200_OK), 1)
+        self.assertEqual(Reservation.objects.filter(companion=companion).count(), 1)
@@ -1,3 +1,43 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+
 from rest_framework.test import APITestCase
 
-# Create your tests here.
+from .factories import ReservationFactory
+from ..models import Reservation
+
+
+class ReservationPeriodTestCase(APITestCase):
+    def test_period_is_set_on_save(self):
+        reservation = ReservationFactory(date=datetime.date(2023, 6, 1), start=datetime.time(10), end=datetime.time(11, 30))
+
+        self.assertEqual(reservation.starts_at, datetime.datetime(2023, 6, 1, 10))
+        self.assertEqual(reservation.ends_at, datetime.datetime(2023, 6, 1, 11, 30))
+
+        reservation.start = datetime.time(9)
+        reservation.save(update_fields=['start'])
+        self.assertEqual(Reservation.objects.get(id=reservation.id).starts_at, datetime.datetime(2023, 6, 1, 9))
+
+    def test_backfill_command(self):
+        reservations = ReservationFactory.create_batch(3)
+        Reservation.objects.update(starts_at=None, ends_at=None)
+
+        out = StringIO()
+        call_command('backfill_reservation_periods', '--batch-size', '2', stdout=out)
+
+        self.assertIn('updated 3 reservations', out.getvalue())
+        self.assertListEqual(
+            list(Reservation.objects.order_by('id').values_list('starts_at', 'ends_at')),
+            [(datetime.datetime(2023, 6, 1, 10), datetime.datetime(2023, 6, 1, 11))] * len(reservations),
+        )
+
+    def test_backfill_command_sets_weekday_mask_of_legacy_series(self):
+        # weekday_mask가 추가되기 전에 저장된 반복 예약
+        series = ReservationFactory(is_scheduled=True, day=['mon', 'thu'], schedule_daedline=datetime.date(2023, 6, 30))
+        Reservation.objects.update(weekday_mask=0)
+
+        call_command('backfill_reservation_periods', stdout=StringIO())
+
+        self.assertEqual(Reservation.objects.get(id=series.id).weekday_mask, 0b1001)
@@ -0,0 +1,61 @@
+import datetime
+
+from rest_framework.test import APITestCase
+
+from ..models import Reservation
+from ..recurrences import get_weekday_mask, get_schedule_weekday_mask, iter_occurrences
+
+
+class WeekdayMaskTestCase(APITestCase):
+    def test_list_of_names(self):
+        self.assertEqual(get_weekday_mask(['mon', 'Wednesday']), 0b0000101)
+
+    def test_korean_names(self):
+        self.assertEqual(get_weekday_mask(['월', '금요일']), 0b0010001)
+
+    def test_dict(self):
+        self.assertEqual(get_weekday_mask({'tue': True, 'thu': False, 'sun': 1}), 0b1000010)
+
+    def test_string(self):
+        self.assertEqual(get_weekday_mask('월, 수'), 0b0000101)
+
+    def test_integers(self):
+        self.assertEqual(get_weekday_mask([0, 6, 7, True]), 0b1000001)
+
+    def test_unknown_falls_back_to_start_date(self):
+        thursday = datetime.date(2023, 6, 1)
+        self.assertEqual(get_weekday_mask({}), 0)
+        self.assertEqual(get_schedule_weekday_mask({}, thursday), 0b0001000)
+
+
+class IterOccurrencesTestCase(APITestCase):
+    def test_single_reservation(self):
+        reservation = Reservation(date=datetime.date(2023, 6, 1))
+
+        self.assertListEqual(
+            list(iter_occurrences(reservation, datetime.date(2023, 6, 1), datetime.date(2023, 6, 30))),
+            [datetime.date(2023, 6, 1)],
+        )
+        self.assertListEqual(
+            list(iter_occurrences(reservation, datetime.date(2023, 6, 2), datetime.date(2023, 6, 30))), []
+        )
+
+    def test_recurring_reservation_is_clipped_to_window_and_deadline(self):
+        reservation = Reservation(
+            is_scheduled=True,
+            weekday_mask=get_weekday_mask(['mon', 'thu']),
+            date=datetime.date(2023, 6, 1),
+            schedule_daedline=datetime.date(2023, 6, 15),
+        )
+        occurrences = iter_occurrences(reservation, datetime.date(2023, 5, 1), datetime.date(2023, 12, 31))
+
+        self.assertListEqual(
+            list(occurrences),
+            [
+                datetime.date(2023, 6, 1),
+                datetime.date(2023, 6, 5),
+                datetime.date(2023, 6, 8),
+                datetime.date(2023, 6, 12),
+                datetime.date(2023, 6, 15),
+            ],
+        )
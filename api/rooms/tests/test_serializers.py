@@ -1,3 +1,71 @@
 from rest_framework.test import APITestCase
 
-# Create your tests here.
+from .factories import RoomFactory
+from ..serializers import ReservationSerializer
+from users.tests.factories import UserFactory, UserTypeFactory
+
+
+class ReservationSerializerTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user_type = UserTypeFactory()
+        cls.booker = UserFactory(user_type=user_type)
+        cls.companions = UserFactory.create_batch(20, user_type=user_type)
+        cls.room = RoomFactory()
+
+    def __data(self, companion):
+        return {
+            'booker': self.booker.id, 'room': self.room.id, 'date': '2023-06-01',
+            'start': '10:00:00', 'end': '11:00:00', 'reason': '회의', 'companion': companion,
+        }
+
+    def test_companions_are_validated_and_saved_in_bulk(self):
+        companion_ids = [user.id for user in self.companions]
+        serializer = ReservationSerializer(data=self.__data(companion_ids + companion_ids[:2]))
+
+        # booker, room, companion 검증 query 1번씩
+        with self.assertNumQueries(3):
+            self.assertTrue(serializer.is_valid())
+
+        # 예약 insert, 동반 참석자 insert
+        with self.assertNumQueries(2):
+            reservation = serializer.save()
+
+        self.assertListEqual(sorted(reservation.companion.values_list('id', flat=True)), companion_ids)
+
+    def test_all_missing_companions_are_reported(self):
+        serializer = ReservationSerializer(data=self.__data([self.companions[0].id, 0, -1]))
+
+        self.assertFalse(serializer.is_valid())
+        self.assertListEqual(
+            serializer.errors['companion'],
+            ['Invalid pk "0" - object does not exist.', 'Invalid pk "-1" - object does not exist.'],
+        )
+
+    def test_incorrect_type(self):
+        for value, data_type in (('a', 'str'), (True, 'bool'), (1.9, 'float'), ([1], 'list')):
+            with self.subTest(value=value):
+                serializer = ReservationSerializer(data=self.__data([self.companions[0].id, value]))
+
+                self.assertFalse(serializer.is_valid())
+                self.assertEqual(serializer.errors['companion'][0].code, 'incorrect_type')
+                self.assertIn(f'received {data_type}', serializer.errors['companion'][0])
+
+    def test_companion_is_optional(self):
+        data = self.__data([])
+        del data['companion']
+        serializer = ReservationSerializer(data=data)
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertFalse(serializer.save().companion.exists())
+
+    def test_date_is_required(self):
+        data = self.__data([])
+        serializer = ReservationSerializer(data={**data, 'date': None})
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['date'][0].code, 'null')
+
+        del data['date']
+        serializer = ReservationSerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['date'][0].code, 'required')
@@ -1,3 +1,215 @@
+import base64
+import datetime
+import json
+from unittest import mock
+
+from django.core.cache import cache
+
 from rest_framework.test import APITestCase
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED, HTTP_404_NOT_FOUND
+
+from common.paginations import KeysetPagination
+
+from users.tests.factories import UserFactory, UserTypeFactory
+from .factories import RoomFactory, ReservationFactory
+from ..availability import SLOTS_PER_DAY
+from ..models import CancelledOccurrence, Reservation
+
+
+def decode_busy_slots(encoded):
+    bitmap = base64.b64decode(encoded)
+    return [slot for slot in range(SLOTS_PER_DAY) if bitmap[slot // 8] & (0x80 >> (slot % 8))]
+
+
+class RoomAvailabilityTestCase(APITestCase):
+    url = '/api/rooms/availability'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(user_type=UserTypeFactory())
+        cls.room = RoomFactory()
+        cls.other_room = RoomFactory()
+
+        # 6/1(목) 10:00 ~ 10:30
+        ReservationFactory(
+            booker=cls.user, room=cls.room, date=datetime.date(2023, 6, 1),
+            start=datetime.time(10), end=datetime.time(10, 30),
+        )
+        # 6/1 ~ 6/30 매주 금 09:00 ~ 09:10
+        cls.series = ReservationFactory(
+            booker=cls.user, room=cls.room, is_scheduled=True, day=['fri'], date=datetime.date(2023, 6, 1),
+            schedule_daedline=datetime.date(2023, 6, 30), start=datetime.time(9), end=datetime.time(9, 10),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def test_success(self):
+        response = self.client.get(self.url, {'rooms': f'{self.room.id},{self.other_room.id}', 'start': '2023-06-01', 'end': '2023-06-02'})
+        body_data = json.loads(response.content)
+        rooms = body_data['rooms']
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(body_data['slot_minutes'], 5)
+        self.assertListEqual(decode_busy_slots(rooms[str(self.room.id)]['2023-06-01']), list(range(120, 126)))
+        self.assertListEqual(decode_busy_slots(rooms[str(self.room.id)]['2023-06-02']), [108, 109])
+        self.assertListEqual(decode_busy_slots(rooms[str(self.other_room.id)]['2023-06-01']), [])
+
+    def test_cached_bitmap_is_invalidated_on_write(self):
+        query_params = {'rooms': self.room.id, 'start': '2023-06-05'}
+        response = self.client.get(self.url, query_params)
+        self.assertListEqual(decode_busy_slots(json.loads(response.content)['rooms'][str(self.room.id)]['2023-06-05']), [])
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url, query_params)
+
+        ReservationFactory(
+            booker=self.user, room=self.room, date=datetime.date(2023, 6, 5),
+            start=datetime.time(0), end=datetime.time(0, 5),
+        )
+        response = self.client.get(self.url, query_params)
+        self.assertListEqual(decode_busy_slots(json.loads(response.content)['rooms'][str(self.room.id)]['2023-06-05']), [0])
+
+    def test_cached_bitmap_is_invalidated_on_cancelled_occurrence(self):
+        query_params = {'rooms': self.room.id, 'start': '2023-06-02'}
+        self.client.get(self.url, query_params)
+
+        # commit 전에 다른 요청이 cache를 다시 채웠더라도 commit 후 한 번 더 비운다.
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            CancelledOccurrence.objects.create(reservation=self.series, date=datetime.date(2023, 6, 2))
+        self.assertEqual(len(callbacks), 1)
+
+        response = self.client.get(self.url, query_params)
+        self.assertListEqual(decode_busy_slots(json.loads(response.content)['rooms'][str(self.room.id)]['2023-06-02']), [])
+
+    def test_invalid_date_range(self):
+        response = self.client.get(self.url, {'start': '2023-06-01', 'end': '2023-08-01'})
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {'start': '2023-06-02', 'end': '2023-06-01'})
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+
+    def test_anonymous_user_permission_denied(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {'start': '2023-06-01'})
+
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+
+
+class MyReservationListTestCase(APITestCase):
+    url = '/api/rooms/my-reservations'
+
+    @classmethod
+    def setUpTestData(cls):
+        user_type = UserTypeFactory()
+        cls.user = UserFactory(user_type=user_type)
+        cls.companions = UserFactory.create_batch(2, user_type=user_type)
+        cls.room = RoomFactory()
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def __create_reservations(self, count):
+        for reservation in ReservationFactory.create_batch(count, booker=self.user, room=self.room):
+            reservation.companion.set(self.companions)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        # count, 예약 + booker + room + images, companion prefetch
+        self.__create_reservations(1)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        self.__create_reservations(30)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(json.loads(response.content)['results']), 31)
+
+    def test_companion_excludes_password(self):
+        self.__create_reservations(1)
+
+        response = self.client.get(self.url)
+        companion = json.loads(response.content)['results'][0]['companion'][0]
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertNotIn('password', companion)
+        self.assertEqual(companion['name'], self.companions[0].name)
+
+
+class ReservationCursorPaginationTestCase(APITestCase):
+    url = '/api/rooms/reservations'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(user_type=UserTypeFactory())
+        rooms = RoomFactory.create_batch(2)
+        slots = [
+            (datetime.date(2023, 6, 2), datetime.time(9)),
+            (datetime.date(2023, 6, 1), datetime.time(13)),
+            (datetime.date(2023, 6, 1), datetime.time(10)),
+            (datetime.date(2023, 6, 2), datetime.time(9)),
+            (datetime.date(2023, 6, 1), datetime.time(10)),
+        ]
+        for i, (date, start) in enumerate(slots):
+            ReservationFactory(booker=cls.user, room=rooms[i % 2], date=date, start=start, end=datetime.time(start.hour + 1))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+        page_size = mock.patch.object(KeysetPagination, 'page_size', 2)
+        page_size.start()
+        self.addCleanup(page_size.stop)
+
+    def test_pages_follow_keyset_ordering(self):
+        expected_ids = list(Reservation.objects.order_by('date', 'start', 'id').values_list('id', flat=True))
+
+        ids, url = [], f'{self.url}?cursor='
+        while url:
+            # 예약, companion prefetch
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            body_data = json.loads(response.content)
+            self.assertNotIn('count', body_data)
+            ids += [reservation['id'] for reservation in body_data['results']]
+            url = body_data['next']
+
+        self.assertListEqual(ids, expected_ids)
+
+    def test_pages_include_null_date_rows(self):
+        # date가 NULL인 이전 예약은 가장 앞에 오고, 그 뒤의 cursor도 이어서 동작해야 한다.
+        null_dates = [ReservationFactory(booker=self.user, date=None).id for _ in range(3)]
+        expected_ids = sorted(null_dates) + list(
+            Reservation.objects.filter(date__isnull=False).order_by('date', 'start', 'id').values_list('id', flat=True)
+        )
+
+        ids, url = [], f'{self.url}?cursor='
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, HTTP_200_OK)
+            body_data = json.loads(response.content)
+            ids += [reservation['id'] for reservation in body_data['results']]
+            url = body_data['next']
+
+        self.assertListEqual(ids, expected_ids)
+
+    def test_estimated_count_is_cached(self):
+        response = self.client.get(self.url, {'cursor': '', 'count': 'true'})
+        self.assertEqual(json.loads(response.content)['count'], 5)
+
+        ReservationFactory(booker=self.user)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'cursor': '', 'count': 'true'})
+        self.assertEqual(json.loads(response.content)['count'], 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'invalid'})
+
+        self.assertEqual(response.status_code, HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_without_cursor(self):
+        response = self.client.get(self.url)
+        body_data = json.loads(response.content)
 
-# Create your tests here.
+        self.assertEqual(body_data['count'], 5)
+        self.assertEqual(len(body_data['results']), 2)
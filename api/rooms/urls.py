@@ -4,10 +4,12 @@ from .views import (
     ReservationView,
     RoomView,
     authenticate_location,
+    get_room_availability,
 )
 
 urlpatterns = [
     path("", RoomView.as_view({"get": "list", "post": "create"})),
+    path("/availability", get_room_availability),
     path(
         "/<int:id>",
         RoomView.as_view(
@@ -46,5 +48,9 @@ urlpatterns = [
             }
         ),
     ),
+    path(
+        "/my-reservations/<int:pk>/occurrences/<str:date>",
+        MyReservationView.as_view({"delete": "cancel_occurrence"}),
+    ),
     path("/reservations/<int:id>/location", authenticate_location),
 ]
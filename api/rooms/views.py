@@ -1,21 +1,35 @@
-import json
-import pytz
 from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
     HTTP_202_ACCEPTED,
+    HTTP_204_NO_CONTENT,
     HTTP_400_BAD_REQUEST,
 )
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
 from django.core.exceptions import BadRequest
-from rest_framework.exceptions import APIException
+from common.mailing import enqueue_mail
 from users.models import User
 
-from common.calendars import create_calendar_event, delete_calendar_event
-from .models import GoogleCalenderLog, Reservation, Room, RoomImages
+from .availability import SLOT_MINUTES, get_availability
+from .calendar_sync import (
+    enqueue_event_creations,
+    enqueue_event_deletions,
+    enqueue_occurrence_cancellations,
+)
+from .conflicts import find_participant_conflicts, find_schedule_conflicts
+from .locks import lock_participants, lock_schedule
+from .recurrences import get_schedule_weekday_mask, iter_occurrences
+from .models import (
+    ATTENDANCE_WINDOW,
+    CancelledOccurrence,
+    Reservation,
+    Room,
+    RoomImages,
+)
 from .serializers import (
+    CompanionSerializer,
     MyReservationSerializer,
     ReservationSerializer,
     RoomSerializer,
@@ -25,19 +39,18 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.filters import SearchFilter
 import django_filters
 from django_filters.rest_framework import DjangoFilterBackend
-from datetime import datetime, timedelta
+from datetime import date, datetime
 from django.views.decorators.csrf import csrf_exempt
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.utils import timezone
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg.openapi import Parameter, IN_QUERY, TYPE_STRING, TYPE_INTEGER, TYPE_NUMBER
-import logging
 from haversine import haversine
 from drf_yasg.utils import swagger_auto_schema
 
 
+from common.logging import get_logger
 from users.permissions import (
     IsAdminOrReadOnly,
     IsOwnerOrAdmin,
@@ -48,25 +61,68 @@ from users.permissions import (
 
 AI_CENTER_POINT = (37.551100, 127.075750)
 ALLOWED_DISTANCE = 25
-
-
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-
-
-def check_schedule_conflict(date, start, end):
-    conflicting_schedules = Reservation.objects.filter(
-        date=date,
-        start__lt=end,  # 등록하려는 일정의 종료일 이후에 시작하는 일정
-        end__gt=start,  # 등록하려는 일정의 시작일 이전에 종료하는 일정
-    ).all()
-    logger.warning(conflicting_schedules)
+MAX_AVAILABILITY_DAYS = 31
+
+
+logger = get_logger(__name__)
+
+
+def check_schedule_conflict(
+    room,
+    date,
+    start,
+    end,
+    is_scheduled=False,
+    day=None,
+    schedule_daedline=None,
+):
+    # 같은 회의실의 단일 예약, 반복 예약 중 [start, end)와 겹치는 예약 탐색
+    weekday_mask = 0
+    if is_scheduled:
+        weekday_mask = get_schedule_weekday_mask(day, date)
+    conflicting_schedules = find_schedule_conflicts(
+        getattr(room, "id", room),
+        date,
+        start,
+        end,
+        weekday_mask=weekday_mask,
+        until=schedule_daedline,
+    )
     if conflicting_schedules:
+        logger.info(
+            "schedule_conflict",
+            room=getattr(room, "id", room),
+            date=date,
+            start=start,
+            end=end,
+            conflicts=conflicting_schedules,
+        )
         raise BadRequest  # 겹치는 일정이 존재하는 경우
     return True  # 겹치는 일정이 없는 경우
 
 
+def get_participant_conflicts(
+    booker,
+    companion,
+    date,
+    start,
+    end,
+    is_scheduled=False,
+    day=None,
+    schedule_daedline=None,
+):
+    # 예약자와 동반 참석자가 같은 시간대에 이미 예약자나 동반 참석자로 참석하는 일정
+    if date is None:
+        return []
+    weekday_mask = 0
+    if is_scheduled:
+        weekday_mask = get_schedule_weekday_mask(day, date)
+    user_ids = [booker.id, *(user.id for user in companion)]
+    return find_participant_conflicts(
+        user_ids, date, start, end, weekday_mask=weekday_mask, until=schedule_daedline
+    )
+
+
 @swagger_auto_schema(
     method="POST",
     manual_parameters=[
@@ -105,9 +161,8 @@ def authenticate_location(request, id):
         )
 
     reservation = Reservation.objects.get(id=id)
-    start_datetime = datetime.combine(reservation.date, reservation.start)
-    criteria = timedelta(seconds=600)
-    if not (start_datetime - criteria < timezone.now() < start_datetime + criteria):
+    criteria = ATTENDANCE_WINDOW
+    if not (reservation.starts_at - criteria < timezone.now() < reservation.starts_at + criteria):
         return Response({"message": "not available time"}, status=HTTP_400_BAD_REQUEST)
 
     current_point = (latitude, logtitude)
@@ -123,9 +178,67 @@ def authenticate_location(request, id):
     return Response(distance < ALLOWED_DISTANCE)
 
 
+@swagger_auto_schema(
+    method="GET",
+    manual_parameters=[
+        Parameter(
+            "rooms",
+            IN_QUERY,
+            type=TYPE_STRING,
+            description="쉼표로 구분한 회의실 id, 생략하면 모든 회의실\nex) 1,2,3",
+        ),
+        Parameter(
+            "start",
+            IN_QUERY,
+            type=TYPE_STRING,
+            description="조회 시작 날짜\nex) 2023-06-01",
+        ),
+        Parameter(
+            "end",
+            IN_QUERY,
+            type=TYPE_STRING,
+            description="조회 종료 날짜(포함), 생략하면 시작 날짜와 같음\nex) 2023-06-07",
+        ),
+    ],
+    responses={
+        200: '"slot_minutes": 5\n"rooms": {회의실 id: {날짜: base64 bitmap}}\n5분 slot마다 1bit, 사용 중이면 1(0시 slot이 첫 byte의 최상위 bit)',
+        400: "날짜 형식(YYYY-MM-DD), 회의실 id 형식, 조회 기간 확인",
+    },
+    operation_description=f"회의실별, 날짜별 사용 가능 시간 bitmap 조회\n최대 {MAX_AVAILABILITY_DAYS}일까지 조회 가능",
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_room_availability(request):
+    try:
+        since = date.fromisoformat(request.query_params["start"])
+        until = date.fromisoformat(request.query_params.get("end", since.isoformat()))
+    except (KeyError, ValueError):
+        return Response("pass start and end as YYYY-MM-DD.", HTTP_400_BAD_REQUEST)
+
+    if not 0 <= (until - since).days < MAX_AVAILABILITY_DAYS:
+        return Response(
+            f"end must be within {MAX_AVAILABILITY_DAYS} days from start.",
+            HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        room_ids = [int(id) for id in request.query_params.get("rooms", "").split(",") if id]
+    except ValueError:
+        return Response("rooms must be comma separated ids.", HTTP_400_BAD_REQUEST)
+    if not room_ids:
+        room_ids = list(Room.objects.order_by("id").values_list("id", flat=True))
+
+    return Response(
+        {
+            "slot_minutes": SLOT_MINUTES,
+            "rooms": get_availability(room_ids, since, until),
+        }
+    )
+
+
 class RoomView(viewsets.ModelViewSet):
     permission_classes = [IsAdminOrReadOnly]
-    queryset = Room.objects.all()
+    queryset = Room.objects.select_related("images")
     serializer_class = RoomSerializer
     lookup_field = "id"
 
@@ -154,9 +267,10 @@ class RoomView(viewsets.ModelViewSet):
 class ReservationView(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = ReservationSerializer
-    queryset = Reservation.objects.all()
+    queryset = Reservation.objects.prefetch_related("companion")
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["date", "room", "schedule_daedline"]
+    cursor_ordering = ("date", "start", "id")
 
     def __send_email(self, room_name, user_name, date, start, end, to_email):
         context = {
@@ -166,88 +280,59 @@ class ReservationView(viewsets.ModelViewSet):
             "start": start,
             "end": end,
         }
-        send_mail(
+        enqueue_mail(
             "회의 일정을 안내해드립니다.",
-            "",
-            from_email=None,
-            recipient_list=[to_email],
-            html_message=render_to_string("mailing/reservation.html", context=context),
+            [to_email],
+            template_name="mailing/reservation.html",
+            context=context,
         )
 
     def create(self, request):
-        if not check_schedule_conflict(
-            request.data.get("date"), request.data.get("start"), request.data.get("end")
-        ):
-            raise BadRequest
         serializer = ReservationSerializer(data=request.data)
         if serializer.is_valid(raise_exception=True):
-            try:
-                serializer.save()
-            except Exception as e:
-                return Response({"message": e})
-
-            timezone = pytz.timezone("Asia/Seoul")
-            date = datetime.strptime(serializer.data["date"], "%Y-%m-%d").date()
-            start = datetime.strptime(serializer.data["start"], "%H:%M:%S").time()
-            end = datetime.strptime(serializer.data["end"], "%H:%M:%S").time()
-            start_datetime = timezone.localize(
-                datetime.combine(date, start)
-            ).isoformat()
-            end_datetime = timezone.localize(datetime.combine(date, end)).isoformat()
-
-            room = Room.objects.filter(id=serializer.data["room"]).get()
-            reservation = Reservation.objects.filter(id=serializer.data["id"]).get()
-        try:
-            # 예약자 구글 캘린더 등록
-            booker = User.objects.filter(id=serializer.data["booker"]).get()
-            logger.warning(booker)
-            event_result = create_calendar_event(
-                user=booker,
-                summary=serializer.data["reason"],
-                start_datetime=start_datetime,
-                end_datetime=end_datetime,
-                location=room.name,
-            ).json()
-
-            try:
-                log = GoogleCalenderLog.objects.create(
-                    owner=booker,
-                    event_id=event_result["id"],
-                    reservation=reservation,
+            schedule = {
+                field: serializer.validated_data.get(
+                    field, Reservation._meta.get_field(field).get_default()
                 )
-            except Exception as e:
-                logger.warning({"message": e})
-        except APIException:
-            pass
-        except Exception as e:
-            return Response({"message": e})
-
-        try:  # 동반 참석자들 구글 캘린더 등록
-            for com in serializer.data["companion"]:
-                logger.warning(com)
-                companion = User.objects.filter(id=com).get()
-
-                event_result = create_calendar_event(
-                    user=companion,
-                    summary=serializer.data["reason"],
-                    start_datetime=start_datetime,
-                    end_datetime=end_datetime,
-                    location=room.name,
-                ).json()
-                logger.warning(event_result["id"])
-                try:
-                    log = GoogleCalenderLog.objects.create(
-                        owner=companion,
-                        event_id=event_result["id"],
-                        reservation=reservation,
+                for field in (
+                    "room",
+                    "date",
+                    "start",
+                    "end",
+                    "is_scheduled",
+                    "day",
+                    "schedule_daedline",
+                )
+            }
+            # 충돌 검사와 저장 사이에 같은 시간대 예약이 끼어들지 않도록 lock 안에서 DB 기준으로 검사
+            with lock_schedule(
+                getattr(schedule["room"], "id", None),
+                schedule["date"],
+                schedule["is_scheduled"],
+            ):
+                check_schedule_conflict(**schedule)
+                booker = serializer.validated_data["booker"]
+                companion = serializer.validated_data.get("companion", [])
+                lock_participants([booker.id, *(user.id for user in companion)])
+                participant_conflicts = get_participant_conflicts(
+                    booker,
+                    companion,
+                    **{key: value for key, value in schedule.items() if key != "room"},
+                )
+                if participant_conflicts:
+                    return Response(
+                        {"participant_conflicts": participant_conflicts},
+                        status=HTTP_400_BAD_REQUEST,
                     )
+                try:
+                    with transaction.atomic():
+                        reservation = serializer.save()
+                        # 구글 캘린더 등록은 sync_calendars worker가 commit 이후 처리
+                        enqueue_event_creations(reservation)
                 except Exception as e:
-                    return Response({"error": e})
-            return Response({"message": "complete"})
-        except APIException:
-            pass
-        except Exception as e:
-            return Response({"message": e})
+                    return Response({"message": e})
+
+        return Response({"message": "complete"})
 
 
 class MyReservationFilter(django_filters.FilterSet):
@@ -263,20 +348,47 @@ class MyReservationFilter(django_filters.FilterSet):
 class MyReservationView(viewsets.ModelViewSet):
     permission_classes = [IsOwnerOrAdmin]
     serializer_class = MyReservationSerializer
-    queryset = Reservation.objects.all()
+    # 예약 수와 관계없이 booker, room(images), companion을 고정된 query 수로 조회
+    queryset = Reservation.objects.select_related("booker", "room__images").prefetch_related(
+        Prefetch(
+            "companion",
+            queryset=User.objects.only(*CompanionSerializer.Meta.fields).order_by("id"),
+        )
+    )
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_class = MyReservationFilter
     search_fields = ["day"]
 
     def destroy(self, request, pk, *args, **kwargs):
-        reservation = Reservation.objects.filter(id=pk).get()
-        google_calender_log = GoogleCalenderLog.objects.filter(reservation__id=pk).all()
-
-        for log in google_calender_log:
-            try:
-                event_result = delete_calendar_event(log.owner, log.event_id).json()
-                logger.warning(event_result)
-            except Exception as e:
-                logger.warning(e)
-
-        return super().destroy(request, *args, **kwargs)
+        with transaction.atomic():
+            enqueue_event_deletions(pk)
+            return super().destroy(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        responses={
+            204: "",
+            400: '반복 예약이 아니거나 해당 날짜에 일정이 없음\n"message": "not an occurrence"',
+        },
+        operation_description="반복 예약 중 date(YYYY-MM-DD) 날짜의 일정 하나만 취소",
+    )
+    def cancel_occurrence(self, request, pk, date, *args, **kwargs):
+        reservation = self.get_object()
+        try:
+            date = datetime.strptime(date, "%Y-%m-%d").date()
+        except ValueError:
+            return Response("date must be YYYY-MM-DD format.", HTTP_400_BAD_REQUEST)
+
+        if not reservation.is_scheduled or next(
+            iter_occurrences(reservation, date, date), None
+        ) is None:
+            return Response(
+                {"message": "not an occurrence"}, status=HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            _, created = CancelledOccurrence.objects.get_or_create(
+                reservation=reservation, date=date
+            )
+            if created:
+                enqueue_occurrence_cancellations(reservation, date)
+        return Response(status=HTTP_204_NO_CONTENT)
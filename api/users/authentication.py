@@ -0,0 +1,115 @@
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import User
+
+
+def get_cached_fields():
+    # 비밀번호 hash는 cache에 두지 않고 필요할 때만 조회
+    return [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+
+
+@lru_cache(maxsize=None)
+def get_cached_fields_version():
+    return zlib.crc32(','.join(get_cached_fields()).encode())
+
+
+def get_token_cache_key(key):
+    # cache에는 field 순서대로 값만 저장하므로, User field가 바뀐 배포 이전의 값은 key가 달라져 쓰이지 않는다.
+    return f'users:token:{get_cached_fields_version()}:{key}'
+
+
+class LocalTokenCache:
+    """process 안에서 token → user 값을 보관하는 크기 제한 LRU (항목마다 TTL)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            values, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return values
+
+    def set(self, key, values):
+        with self.lock:
+            self.entries[key] = (values, time.monotonic() + getattr(settings, 'TOKEN_CACHE_LOCAL_TIMEOUT'))
+            self.entries.move_to_end(key)
+            while len(self.entries) > getattr(settings, 'TOKEN_CACHE_SIZE'):
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_token_cache = LocalTokenCache()
+
+
+def invalidate_token(key):
+    local_token_cache.delete(key)
+    cache.delete(get_token_cache_key(key))
+
+
+def invalidate_user_tokens(user_id):
+    for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        invalidate_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication과 같지만 token에 해당하는 user 값을 process LRU와 Django cache에 보관
+    user 수정, 비활성화, token 삭제, logout 시 signal로 무효화된다.
+    Django cache가 process 사이에 공유되어야(settings.REDIS_URL) 다른 process에도 무효화가 전달된다.
+    """
+
+    def get_user_values(self, key):
+        values = cache.get(get_token_cache_key(key))
+        if values is not None:
+            return values
+
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        values = [getattr(token.user, field) for field in get_cached_fields()]
+        cache.set(get_token_cache_key(key), values, getattr(settings, 'TOKEN_CACHE_TIMEOUT'))
+        return values
+
+    def get_user(self, key):
+        # 다른 process에서 무효화된 값은 local cache의 TTL이 지나면 반영된다.
+        values = local_token_cache.get(key)
+        if values is None:
+            values = self.get_user_values(key)
+            local_token_cache.set(key, values)
+        return User.from_db('default', get_cached_fields(), values)
+
+    def authenticate_credentials(self, key):
+        user = self.get_user(key)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (user, self.get_model()(key=key, user=user))
@@ -47,11 +47,12 @@ user 다중 생성
 지정된 양식의 csv파일을 http body에 form 형식으로 전달. 이 때 key는 user_input
 key의 이름이 잘못되면 400 반환
 
-csv 파일 전달에 성공하면 200과 함께 csv 형식의 데이터가 반환되는데, 
-데이터의 형식이 정확하고 user_no의 중복 검사가 성공하면 'user_no_duplicated'와 'errors' 열이 비어있으며 유저가 생성됨
-실패하면 'user_no_duplicated'와 'errors' 열에 값이 채워져 있으며 아무런 유저가 생성되지 않음
+csv 파일 전달에 성공하면 줄마다의 검사 결과가 json으로 반환되는데, 
+데이터의 형식이 정확하고 user_no의 중복 검사가 성공하면 200과 함께 'user_no_duplicated'와 'errors' 열이 비어있으며 유저가 생성됨
+실패하면 400과 함께 'user_no_duplicated'와 'errors' 열에 값이 채워져 있으며 아무런 유저가 생성되지 않음
+생성 중 다른 요청이 같은 user_no를 생성하면 409를 반환하며 아무런 유저가 생성되지 않음
 
-user_no_duplicated: 입력 데이터의 user_no에 중복된 값들이 존재
+user_no_duplicated: 입력 데이터 안에서 user_no가 중복된 줄 (중복된 줄 모두 표시)
 errors: data의 형식이 잘못됐으며(이메일 형식, 이미 존재하는 user_no, user_type 또는 department의 잘못된 id 등) 그 사유가 값으로 출력
 '''
 
@@ -0,0 +1,87 @@
+import csv
+import io
+from collections import Counter
+from itertools import islice
+
+from .models import User
+from .serializers import UserImportSerializer
+
+
+IMPORT_CHUNK_SIZE = 1000
+
+
+def get_unique_error_message():
+    field = User._meta.get_field('user_no')
+    return field.error_messages['unique'] % {
+        'model_name': User._meta.verbose_name,
+        'field_label': field.verbose_name,
+    }
+
+
+class UserCsvImporter:
+    """
+    csv 파일을 chunk 단위로 읽으며 검증한 뒤 user를 생성
+    첫 줄은 field 이름, 두 번째 줄은 한글 header
+    한 줄이라도 오류가 있으면 user를 생성하지 않는다.
+
+    검증과 비밀번호 hash 계산은 transaction 밖에서 끝내고,
+    생성은 하나의 transaction 안에서 chunk_size씩 나눠 insert한다.
+    """
+
+    def __init__(self, file, chunk_size=IMPORT_CHUNK_SIZE, encoding='euc-kr'):
+        self.reader = csv.DictReader(io.TextIOWrapper(file, encoding=encoding, newline=''))
+        self.ko_header = next(self.reader, {})
+        self.ko_header['user_no_duplicated'], self.ko_header['errors'] = '학번/직번 중복', '데이터 형식 에러'
+        self.chunk_size = chunk_size
+        self.lines = []
+        self.error_occured = False
+
+    def chunks(self):
+        while chunk := list(islice(self.reader, self.chunk_size)):
+            yield chunk
+
+    def validate(self, lines):
+        existing = set(
+            User.objects.filter(user_no__in={line['user_no'] for line in lines}).values_list('user_no', flat=True)
+        )
+
+        validated_data_lst = []
+        for line in lines:
+            serializer = UserImportSerializer(data=line)
+            if serializer.is_valid():
+                errors = {}
+                validated_data_lst.append(serializer.validated_data)
+            else:
+                errors = dict(serializer.errors)
+            if line['user_no'] in existing:
+                errors.setdefault('user_no', []).append(get_unique_error_message())
+            line['errors'] = errors or ''
+
+            if errors:
+                self.error_occured = True
+
+        return validated_data_lst
+
+    def mark_duplicates(self):
+        # 파일 안에서 user_no가 중복된 줄은 모두 표시
+        counts = Counter(line['user_no'] for line in self.lines)
+        for line in self.lines:
+            line['user_no_duplicated'] = True if counts[line['user_no']] > 1 else ''
+            if line['user_no_duplicated']:
+                self.error_occured = True
+
+    def run(self):
+        """검증 결과를 self.lines에 채우고 오류가 없으면 user를 생성, 생성 여부를 반환"""
+        validated_data_lst = []
+        for lines in self.chunks():
+            validated_data_lst += self.validate(lines)
+            self.lines += lines
+        self.mark_duplicates()
+        if self.error_occured:
+            return False
+
+        User.objects.bulk_create_users(validated_data_lst, batch_size=self.chunk_size)
+        return True
+
+    def get_report(self):
+        return {'results': [self.ko_header, *self.lines], 'error_occured': self.error_occured}
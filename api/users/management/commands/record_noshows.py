@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.noshows import rebuild_noshows, record_noshows
+
+
+class Command(BaseCommand):
+    help = '출석 가능 시간이 지난 예약을 노쇼 집계에 반영'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='집계를 비우고 전체 예약으로 다시 계산')
+        parser.add_argument('--interval', type=float, default=None, help='지정하면 이 간격(초)마다 반복해서 집계')
+
+    def handle(self, *args, **options):
+        recorded = rebuild_noshows() if options['rebuild'] else record_noshows()
+        self.stdout.write(f'recorded {recorded} no-shows')
+        while options['interval']:
+            time.sleep(options['interval'])
+            self.stdout.write(f'recorded {record_noshows()} no-shows')
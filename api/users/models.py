@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.utils import timezone
 
+from .passwords import hash_passwords
+
 
 class UserManager(BaseUserManager):
     def create_user(self, *args, **kwargs):
@@ -21,6 +23,30 @@ class UserManager(BaseUserManager):
         user.set_password(password)
         return user
 
+    def get_user_instances(self, users_data):
+        """
+        비밀번호 hash를 process pool에서 병렬로 계산해 저장하지 않은 user 목록을 반환
+        users_data는 get_user_instance에 넘기는 인자와 같은 형식의 dict 목록
+        """
+        users_data = [dict(data) for data in users_data]
+        hashed_passwords = hash_passwords([data.pop('password', None) for data in users_data])
+
+        users = []
+        for data, hashed_password in zip(users_data, hashed_passwords):
+            user = self.model(email=self.normalize_email(data.pop('email')), **data)
+            user.password = hashed_password
+            users.append(user)
+        return users
+
+    def bulk_create_users(self, users_data, batch_size=None):
+        """
+        비밀번호 hash를 process pool에서 병렬로 계산한 뒤 생성
+        hash 계산은 transaction 밖에서 끝내고, batch_size씩 나눈 insert는 하나의 transaction으로 묶는다.
+        """
+        users = self.get_user_instances(users_data)
+        with transaction.atomic():
+            return self.bulk_create(users, batch_size=batch_size)
+
 
 class User(AbstractBaseUser):
     id = models.AutoField(primary_key=True)
@@ -38,6 +64,16 @@ class User(AbstractBaseUser):
 
     class Meta:
         db_table = 'user'
+        indexes = [
+            models.Index(fields=['user_type', 'user_no'], name='user_type_user_no_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # user type이 바뀌면 노쇼 집계를 옮기기 위해 조회 시점의 값을 보관 (users.signals)
+        instance._loaded_user_type_id = instance.__dict__.get('user_type_id')
+        return instance
 
     def is_admin(self):
         return self.user_type_id == 1
@@ -59,6 +95,7 @@ class GoogleAccount(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='google_account')
     access_token = models.CharField(max_length=2500)
     refresh_token = models.CharField(max_length=1000)
+    access_token_expires_at = models.DateTimeField(null=True)
 
     class Meta:
         db_table = 'google_account'
@@ -87,3 +124,21 @@ class UserDepartment(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class UserNoshowSummary(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='noshow_summary')
+    noshow = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_noshow_summary'
+
+
+class UserTypeNoshowSummary(models.Model):
+    user_type = models.OneToOneField(UserType, on_delete=models.CASCADE, primary_key=True, related_name='noshow_summary')
+    noshow = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_type_noshow_summary'
@@ -0,0 +1,99 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import F
+
+from rooms.models import ATTENDANCE_WINDOW, Reservation
+from .models import User, UserNoshowSummary, UserTypeNoshowSummary
+
+
+NOSHOW_BATCH_SIZE = 1000
+
+
+def get_closed_reservations(now):
+    # 출석 가능 시간(시작 시간 + ATTENDANCE_WINDOW)이 지난 예약
+    return Reservation.objects.filter(starts_at__lte=now - ATTENDANCE_WINDOW)
+
+
+def increment_summaries(model, field, counts, now):
+    # 동시에 실행된 다른 집계와 같은 행을 만들 수 있으므로 빈 행을 먼저 만들고 증가량만 갱신
+    model.objects.bulk_create([model(**{field: key, 'noshow': 0}) for key in counts], ignore_conflicts=True)
+
+    # 증가량이 같은 행끼리 묶어 한 번에 갱신
+    keys_by_count = defaultdict(list)
+    for key, count in counts.items():
+        keys_by_count[count].append(key)
+    for count, keys in keys_by_count.items():
+        model.objects.filter(**{f'{field}__in': keys}).update(noshow=F('noshow') + count, updated_at=now)
+
+
+def adjust_noshows(user_counts, now=None):
+    """
+    이미 집계된 예약이 삭제되거나 출석 여부, booker가 바뀌었을 때 user별 증감량을 집계에 반영
+    user type 집계는 user의 현재 user type에 반영한다.
+    """
+    user_counts = {user_id: count for user_id, count in user_counts.items() if count}
+    if not user_counts:
+        return
+    now = now or datetime.now()
+    user_types = dict(User.objects.filter(id__in=user_counts).values_list('id', 'user_type_id'))
+    type_counts = Counter()
+    for user_id, count in user_counts.items():
+        if user_id in user_types:
+            type_counts[user_types[user_id]] += count
+
+    with transaction.atomic():
+        increment_summaries(UserNoshowSummary, 'user_id', user_counts, now)
+        increment_summaries(
+            UserTypeNoshowSummary, 'user_type_id', {key: count for key, count in type_counts.items() if count}, now
+        )
+
+
+def move_user_type_noshows(user_id, old_user_type_id, new_user_type_id, now=None):
+    """user type이 바뀐 user의 노쇼 수를 이전 user type 집계에서 새 user type 집계로 옮긴다."""
+    noshow = (
+        UserNoshowSummary.objects.filter(user_id=user_id).values_list('noshow', flat=True).first()
+    )
+    if not noshow:
+        return
+    increment_summaries(
+        UserTypeNoshowSummary, 'user_type_id', {old_user_type_id: -noshow, new_user_type_id: noshow}, now or datetime.now()
+    )
+
+
+def record_noshows(now=None):
+    """
+    출석 가능 시간이 지난 예약을 한 번씩만 노쇼 집계에 반영
+    반영한 노쇼 수를 반환
+    """
+    now = now or datetime.now()
+    recorded = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                get_closed_reservations(now)
+                .filter(noshow_recorded=False)
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('id')
+                .values_list('id', 'is_attended', 'booker_id', 'booker__user_type_id')[:NOSHOW_BATCH_SIZE]
+            )
+            if not rows:
+                return recorded
+
+            Reservation.objects.filter(id__in=[id for id, *_ in rows]).update(noshow_recorded=True)
+            noshows = [(booker_id, user_type_id) for _, is_attended, booker_id, user_type_id in rows if not is_attended]
+            increment_summaries(UserNoshowSummary, 'user_id', Counter(user_id for user_id, _ in noshows), now)
+            increment_summaries(
+                UserTypeNoshowSummary, 'user_type_id', Counter(user_type_id for _, user_type_id in noshows), now
+            )
+            recorded += len(noshows)
+
+
+def rebuild_noshows(now=None):
+    """집계를 비우고 모든 예약을 처음부터 다시 반영"""
+    with transaction.atomic():
+        UserNoshowSummary.objects.all().delete()
+        UserTypeNoshowSummary.objects.all().delete()
+        Reservation.objects.filter(noshow_recorded=True).update(noshow_recorded=False)
+        return record_noshows(now)
@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils.crypto import get_random_string
+
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def get_hashing_workers():
+    return getattr(settings, 'PASSWORD_HASHING_WORKERS', None) or os.cpu_count() or 1
+
+
+def get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # 요청 thread와 DB 연결을 물려받지 않도록 fork 대신 spawn으로 새 process를 띄운다.
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=init_worker
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def make_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def hash_passwords(passwords):
+    """
+    비밀번호 목록을 PASSWORD_HASHING_CHUNK_SIZE개씩 나눠 process pool에서 hash
+    hash 계산은 요청 process의 GIL을 잡지 않으므로 다른 요청 처리를 막지 않는다.
+    """
+    passwords = list(passwords)
+    workers = get_hashing_workers()
+    chunk_size = getattr(settings, 'PASSWORD_HASHING_CHUNK_SIZE')
+    if workers <= 1 or len(passwords) <= chunk_size:
+        return make_passwords(passwords)
+
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    try:
+        results = get_pool(workers).map(make_passwords, chunks)
+        return [hashed for chunk in results for hashed in chunk]
+    except BrokenProcessPool:
+        # worker process가 죽은 경우 다음 요청에서 pool을 새로 만든다.
+        reset_pool()
+        raise
+
+
+def issue_initial_password(context):
+    """
+    초기 비밀번호 메일의 context_loader (common.mailing)
+    메일 대기열에는 user_id만 저장하고, 발송할 때 비밀번호를 새로 발급해 설정한다.
+    """
+    password = get_random_string(length=8)
+    user = get_user_model().objects.get(id=context['user_id'])
+    user.set_password(password)
+    user.save(update_fields=['password'])
+    return {'password': password}
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import UserDepartment, UserType
+
+
+REFERENCE_VERSION_KEY = 'users:reference-version'
+VERSION_CHECK_SECONDS = 1
+
+
+def get_reference_version():
+    version = cache.get(REFERENCE_VERSION_KEY)
+    if version is None:
+        cache.add(REFERENCE_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(REFERENCE_VERSION_KEY)
+    return version
+
+
+class ReferenceTable:
+    """
+    UserType, UserDepartment처럼 거의 바뀌지 않는 참조 테이블을 process 메모리에 보관
+    다른 process의 변경은 공유 cache(settings.REDIS_URL)의 version stamp로 감지한다.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.version = None
+        self.checked_at = 0
+        self.rows = {}
+
+    def __deepcopy__(self, memo):
+        # serializer field에 넘겨도 process 전체에서 하나의 cache를 공유
+        return self
+
+    def __load(self):
+        now = time.monotonic()
+        if self.version is not None and now - self.checked_at < VERSION_CHECK_SECONDS:
+            return self.rows
+
+        with self.lock:
+            version = get_reference_version()
+            if version != self.version:
+                self.rows = {row.id: row for row in self.model.objects.order_by('id')}
+                self.version = version
+            self.checked_at = now
+        return self.rows
+
+    def all(self):
+        return list(self.__load().values())
+
+    def get(self, id):
+        return self.__load().get(id)
+
+    def clear(self):
+        with self.lock:
+            self.version = None
+
+
+user_types = ReferenceTable(UserType)
+user_departments = ReferenceTable(UserDepartment)
+
+
+def invalidate_references():
+    try:
+        cache.incr(REFERENCE_VERSION_KEY)
+    except ValueError:
+        # 버전이 없으면 다음 조회 때 새 버전으로 시작한다.
+        pass
+    user_types.clear()
+    user_departments.clear()
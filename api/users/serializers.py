@@ -1,7 +1,10 @@
+from django.utils.translation import gettext_lazy as _
+
 from rest_framework import serializers
 from rest_framework.exceptions import APIException
 
 from .models import User
+from .references import user_departments, user_types
 
 
 class UserTypeSerializer(serializers.Serializer):
@@ -31,8 +34,13 @@ class UserSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         ret = super().to_representation(instance)
-        ret['user_type'] = UserTypeSerializer(instance.user_type).data
-        ret['department'] = UserDepartmentSerializer(instance.department).data
+        # 참조 테이블은 process cache에서 읽어 user마다 query가 추가되지 않도록 한다.
+        user_type = user_types.get(instance.user_type_id) or instance.user_type
+        department = None
+        if instance.department_id is not None:
+            department = user_departments.get(instance.department_id) or instance.department
+        ret['user_type'] = UserTypeSerializer(user_type).data
+        ret['department'] = UserDepartmentSerializer(department).data
 
         return ret
 
@@ -43,6 +51,47 @@ class UserSerializer(serializers.ModelSerializer):
         return value
     
 
+class ReferenceField(serializers.Field):
+    """process cache의 참조 테이블에서 id로 조회해 query 없이 검증하는 field"""
+
+    default_error_messages = {
+        'does_not_exist': _('Invalid pk "{pk_value}" - object does not exist.'),
+        'incorrect_type': _('Incorrect type. Expected pk value, received {data_type}.'),
+    }
+
+    def __init__(self, table, **kwargs):
+        self.table = table
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            instance = self.table.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+    def to_representation(self, value):
+        return value.pk
+
+
+class UserImportSerializer(UserSerializer):
+    """
+    csv 일괄 생성용 UserSerializer
+    user_no 중복은 importer가 chunk 단위로 한 번에 확인한다.
+    """
+
+    user_type = ReferenceField(user_types)
+    department = ReferenceField(user_departments, allow_null=True)
+
+    class Meta(UserSerializer.Meta):
+        extra_kwargs = {
+            **UserSerializer.Meta.extra_kwargs,
+            'user_no': {'validators': []},
+        }
+
+
 class UserNoshowSerializer(serializers.ModelSerializer):
     noshow = serializers.IntegerField()
 
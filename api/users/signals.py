@@ -0,0 +1,61 @@
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from rooms.models import Reservation
+from .authentication import invalidate_token, invalidate_user_tokens
+from .models import User, UserDepartment, UserType
+from .noshows import adjust_noshows, move_user_type_noshows
+from .references import invalidate_references
+
+
+@receiver(post_save, sender=UserType)
+@receiver(post_delete, sender=UserType)
+@receiver(post_save, sender=UserDepartment)
+@receiver(post_delete, sender=UserDepartment)
+def invalidate_reference_caches(sender, instance, **kwargs):
+    invalidate_references()
+
+
+# user 삭제 시에는 token이 cascade로 함께 삭제되며 invalidate_token_cache가 호출된다.
+@receiver(post_save, sender=User)
+def invalidate_user_token_caches(sender, instance, **kwargs):
+    invalidate_user_tokens(instance.id)
+
+
+@receiver(post_save, sender=User)
+def move_noshows_on_user_type_change(sender, instance, created, **kwargs):
+    loaded_user_type_id = getattr(instance, '_loaded_user_type_id', None)
+    if not created and loaded_user_type_id is not None and loaded_user_type_id != instance.user_type_id:
+        move_user_type_noshows(instance.id, loaded_user_type_id, instance.user_type_id)
+    instance._loaded_user_type_id = instance.user_type_id
+
+
+# 노쇼로 집계된 예약이 삭제되거나 출석 여부, booker가 바뀌면 집계를 되돌린다.
+@receiver(post_save, sender=Reservation)
+def adjust_noshows_on_reservation_save(sender, instance, **kwargs):
+    loaded_booker = getattr(instance, '_loaded_noshow_booker', None)
+    booker = instance.get_noshow_booker()
+    if loaded_booker != booker:
+        adjust_noshows({user_id: count for user_id, count in ((loaded_booker, -1), (booker, 1)) if user_id is not None})
+    instance._loaded_noshow_booker = booker
+
+
+@receiver(post_delete, sender=Reservation)
+def adjust_noshows_on_reservation_delete(sender, instance, **kwargs):
+    booker = instance.get_noshow_booker()
+    if booker is not None:
+        adjust_noshows({booker: -1})
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token_cache(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(user_logged_out)
+def invalidate_token_cache_on_logout(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user_tokens(user.id)
@@ -0,0 +1,109 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.signals import user_logged_out
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED
+
+from .factories import UserFactory, UserTypeFactory
+from ..authentication import get_cached_fields_version, get_token_cache_key, local_token_cache
+from ..models import User
+from ..references import user_departments, user_types
+from ..views import logout_view
+
+
+class CachedTokenAuthenticationTestCase(APITestCase):
+    url = '/api/users/mine'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(user_type=UserTypeFactory())
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        local_token_cache.clear()
+        user_types.clear()
+        user_departments.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_is_cached(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['user_no'], self.user.user_no)
+
+    def test_shared_cache_is_used_when_local_cache_misses(self):
+        self.client.get(self.url)
+        local_token_cache.clear()
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+
+    def test_invalidated_on_user_update(self):
+        self.client.get(self.url)
+
+        self.user.name = '새이름'
+        self.user.save()
+        response = self.client.get(self.url)
+
+        self.assertEqual(json.loads(response.content)['name'], '새이름')
+
+    def test_invalidated_on_deactivation(self):
+        self.client.get(self.url)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+
+    def test_invalidated_on_token_deletion(self):
+        self.client.get(self.url)
+
+        self.token.delete()
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+
+    def test_invalidated_on_logout(self):
+        self.client.get(self.url)
+
+        user_logged_out.send(sender=User, request=None, user=self.user)
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_invalidated_on_logout_view(self):
+        self.client.get(self.url)
+
+        request = APIRequestFactory().post('/logout', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        SessionMiddleware(lambda request: None).process_request(request)
+        logout_view(request)
+
+        self.assertIsNone(local_token_cache.get(self.token.key))
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_cache_key_depends_on_cached_fields(self):
+        key = get_token_cache_key(self.token.key)
+        get_cached_fields_version.cache_clear()
+        self.addCleanup(get_cached_fields_version.cache_clear)
+
+        # User field 구성이 바뀐 배포에서는 이전 배포가 저장한 값을 읽지 않는다.
+        with mock.patch('users.authentication.get_cached_fields', return_value=['id', 'user_no']):
+            self.assertNotEqual(get_token_cache_key(self.token.key), key)
@@ -0,0 +1,136 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+
+from common.calendars import AccessTokenProvider, get_access_token, token_provider
+from common.fakes import FakeGoogleServer, FakeGoogleServerMixin
+from common.http import CircuitBreaker, CircuitBreakerOpen, HttpClient
+from .factories import UserFactory
+from ..models import GoogleAccount, User
+
+
+class AccessTokenProviderTestCase(FakeGoogleServerMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        GoogleAccount.objects.create(user=cls.user, access_token='access_token', refresh_token='refresh_token')
+
+    def setUp(self):
+        super().setUp()
+        token_provider.invalidate(self.user.id)
+
+    def __get_user(self, expires_in):
+        GoogleAccount.objects.filter(user=self.user).update(access_token_expires_at=timezone.now() + expires_in)
+        return User.objects.select_related('google_account').get(id=self.user.id)
+
+    def test_valid_token_is_reused(self):
+        user = self.__get_user(timedelta(minutes=30))
+
+        self.assertEqual(AccessTokenProvider().get(user), 'access_token')
+        self.assertListEqual(self.server.requests, [])
+
+    def test_token_near_expiry_is_refreshed_and_persisted(self):
+        user = self.__get_user(timedelta(seconds=10))
+        provider = AccessTokenProvider()
+
+        access_token = provider.get(user)
+        account = GoogleAccount.objects.get(user=self.user)
+
+        self.assertNotEqual(access_token, 'access_token')
+        self.assertEqual(account.access_token, access_token)
+        self.assertGreater(account.access_token_expires_at, timezone.now() + timedelta(minutes=50))
+        self.assertEqual(provider.get(user), access_token)
+        self.assertEqual(len(self.server.requests_to('POST', '/token')), 1)
+
+    def test_concurrent_refreshes_are_coalesced(self):
+        user = self.__get_user(timedelta(seconds=-10))
+        provider = AccessTokenProvider()
+        barrier = threading.Barrier(8)
+        results = []
+
+        def get_token():
+            barrier.wait()
+            results.append(provider.get(user))
+
+        with mock.patch.object(GoogleAccount, 'save'):
+            threads = [threading.Thread(target=get_token) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(len(self.server.requests_to('POST', '/token')), 1)
+
+    def test_module_provider(self):
+        user = self.__get_user(timedelta(minutes=30))
+        self.assertEqual(get_access_token(user), 'access_token')
+
+
+class HttpClientTestCase(APITestCase):
+    def setUp(self):
+        self.server = FakeGoogleServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+        self.http_client = HttpClient(retries=0, failure_threshold=2, reset_timeout=60)
+
+    def test_breaker_opens_after_consecutive_failures(self):
+        self.server.fail_next(503, 503)
+        self.http_client.post(self.server.url + '/token')
+        self.http_client.post(self.server.url + '/token')
+
+        self.assertEqual(self.http_client.breaker.state, CircuitBreaker.OPEN)
+        self.assertRaises(CircuitBreakerOpen, self.http_client.post, self.server.url + '/token')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.http_client.breaker.stats()['rejected'], 1)
+
+    def test_breaker_half_open_probe(self):
+        self.server.fail_next(503, 503, 503)
+        self.http_client.post(self.server.url + '/token')
+        self.http_client.post(self.server.url + '/token')
+
+        with mock.patch('common.http.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(self.http_client.breaker.state, CircuitBreaker.HALF_OPEN)
+            self.http_client.post(self.server.url + '/token')
+            self.assertEqual(self.http_client.breaker.state, CircuitBreaker.OPEN)
+
+        with mock.patch('common.http.time.monotonic', return_value=time.monotonic() + 122):
+            self.assertEqual(self.http_client.post(self.server.url + '/token').status_code, 200)
+            self.assertEqual(self.http_client.breaker.state, CircuitBreaker.CLOSED)
+
+        stats = self.http_client.breaker.stats()
+        self.assertEqual(stats['opened'], 2)
+        self.assertEqual(stats['half_opened'], 2)
+        self.assertEqual(stats['closed'], 1)
+
+    def test_half_open_probe_is_released_on_unexpected_error(self):
+        self.server.fail_next(503, 503)
+        self.http_client.post(self.server.url + '/token')
+        self.http_client.post(self.server.url + '/token')
+
+        with mock.patch('common.http.time.monotonic', return_value=time.monotonic() + 61):
+            with mock.patch.object(self.http_client.session, 'request', side_effect=ValueError):
+                self.assertRaises(ValueError, self.http_client.post, self.server.url + '/token')
+            self.assertEqual(self.http_client.breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertEqual(self.http_client.post(self.server.url + '/token').status_code, 200)
+            self.assertEqual(self.http_client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_client_errors_do_not_trip_breaker(self):
+        self.server.fail_next(400, 400, 400)
+        for _ in range(3):
+            self.http_client.post(self.server.url + '/token')
+
+        self.assertEqual(self.http_client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_idempotent_requests_are_retried(self):
+        client = HttpClient(retries=2)
+        self.server.fail_next(503)
+
+        response = client.delete(self.server.url + '/calendar/v3/calendars/primary/events/event_id')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(self.server.requests), 2)
@@ -0,0 +1,98 @@
+import json
+from io import BytesIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+
+from rest_framework.test import APITestCase
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from .factories import UserFactory, UserTypeFactory
+from ..imports import UserCsvImporter
+from ..models import User, UserDepartment
+from ..references import user_departments, user_types
+
+
+def make_csv(rows):
+    lines = ['user_no,password,name,email,user_type,department', '학번/직번,비밀번호,이름,이메일,구분,학과']
+    lines += [','.join(map(str, row)) for row in rows]
+    return '\r\n'.join(lines).encode('euc-kr')
+
+
+class UserCsvImportTestCase(APITestCase):
+    url = '/api/users/bulk'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = UserFactory(user_type=UserTypeFactory.create_admin_user_type())
+        cls.user_type = UserTypeFactory()
+        cls.department = UserDepartment.objects.create(name='컴퓨터공학과')
+
+    def setUp(self):
+        cache.clear()
+        user_types.clear()
+        user_departments.clear()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def __row(self, user_no, **kwargs):
+        row = {
+            'user_no': user_no, 'password': 'password', 'name': '홍길동', 'email': f'{user_no}@example.com',
+            'user_type': self.user_type.id, 'department': self.department.id,
+        }
+        row.update(kwargs)
+        return list(row.values())
+
+    def __post(self, rows):
+        file = SimpleUploadedFile('users.csv', make_csv(rows), content_type='text/csv')
+        response = self.client.post(self.url, {'user_input': file}, format='multipart')
+        return response, json.loads(response.content)
+
+    def test_success(self):
+        response, body_data = self.__post([self.__row(f'2023000{i}') for i in range(3)])
+
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertFalse(body_data['error_occured'])
+        self.assertEqual(body_data['results'][0]['user_no'], '학번/직번')
+        self.assertEqual(len(body_data['results']), 4)
+        self.assertEqual(User.objects.filter(user_no__startswith='2023000').count(), 3)
+        self.assertTrue(User.objects.get(user_no='20230000').check_password('password'))
+
+    def test_nothing_is_created_on_error(self):
+        rows = [self.__row('20230000'), self.__row('20230000'), self.__row(self.admin_user.user_no), self.__row('20230001', user_type=999)]
+        response, body_data = self.__post(rows)
+        results = body_data['results'][1:]
+
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertTrue(body_data['error_occured'])
+        self.assertListEqual([line['user_no_duplicated'] for line in results], [True, True, '', ''])
+        self.assertIn('user_no', results[2]['errors'])
+        self.assertIn('user_type', results[3]['errors'])
+        self.assertFalse(User.objects.filter(user_no__startswith='2023000').exists())
+
+    def test_query_count_per_chunk(self):
+        user_types.all()
+        user_departments.all()
+        importer = UserCsvImporter(BytesIO(make_csv([self.__row(f'2023000{i}') for i in range(5)])), chunk_size=2)
+
+        # chunk마다 user_no 조회, savepoint, chunk마다 insert, release
+        with self.assertNumQueries(3 + 1 + 3 + 1):
+            self.assertTrue(importer.run())
+
+        self.assertEqual(User.objects.filter(user_no__startswith='2023000').count(), 5)
+
+    def test_nothing_is_created_on_conflict(self):
+        importer = UserCsvImporter(BytesIO(make_csv([self.__row(f'2023000{i}') for i in range(5)])), chunk_size=2)
+        get_user_instances = User.objects.get_user_instances
+
+        def get_user_instances_after_conflict(users_data):
+            # 검증 후 다른 요청이 같은 user_no를 먼저 생성
+            UserFactory(user_no='20230004', user_type=self.user_type)
+            return get_user_instances(users_data)
+
+        with mock.patch.object(User.objects, 'get_user_instances', side_effect=get_user_instances_after_conflict):
+            with self.assertRaises(IntegrityError):
+                importer.run()
+
+        self.assertListEqual(list(User.objects.filter(user_no__startswith='2023000').values_list('user_no', flat=True)), ['20230004'])
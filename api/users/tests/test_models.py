@@ -1,5 +1,6 @@
 from django.utils import timezone
 from django.contrib.auth.hashers import check_password
+from django.test import override_settings
 
 from rest_framework.test import APITestCase
 
@@ -7,6 +8,7 @@ from freezegun import freeze_time
 from faker import Faker
 
 from ..models import UserManager, User, UserType
+from ..passwords import reset_pool
 
 
 FREEZE_TIME = '2022-12-31 23:59:59'
@@ -140,3 +142,40 @@ class UserTypeTestCase(APITestCase):
 
     def test_str_representaion(self):
         self.assertEqual(str(self.user_type), self.user_type.name)
+
+
+class BulkCreateUsersTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_type = UserType.objects.create(id=1, name='admin', possible_duration=0)
+
+    def __users_data(self, count):
+        return [
+            {'user_no': f'user_no{i}', 'name': 'name', 'email': f'user{i}@SeJong.ac.kr', 'user_type': self.user_type, 'password': f'password{i}'}
+            for i in range(count)
+        ]
+
+    def __assert_created(self, count):
+        users = User.objects.order_by('id')
+        self.assertEqual(users.count(), count)
+        for i, user in enumerate(users):
+            self.assertTrue(user.check_password(f'password{i}'))
+            self.assertEqual(user.email, f'user{i}@sejong.ac.kr')
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1)
+    def test_hash_in_process(self):
+        # savepoint, insert, release
+        with self.assertNumQueries(3):
+            User.objects.bulk_create_users(self.__users_data(3))
+
+        self.__assert_created(3)
+
+    @override_settings(PASSWORD_HASHING_WORKERS=2, PASSWORD_HASHING_CHUNK_SIZE=2)
+    def test_hash_in_process_pool(self):
+        self.addCleanup(reset_pool)
+
+        # savepoint, insert, release
+        with self.assertNumQueries(3):
+            User.objects.bulk_create_users(self.__users_data(5))
+
+        self.__assert_created(5)
@@ -0,0 +1,118 @@
+import datetime
+import json
+from io import StringIO
+
+from django.core.management import call_command
+
+from rest_framework.test import APITestCase
+
+from rooms.models import Reservation
+from rooms.tests.factories import ReservationFactory, RoomFactory
+from .factories import UserFactory, UserTypeFactory
+from ..models import User, UserNoshowSummary, UserTypeNoshowSummary
+from ..noshows import rebuild_noshows, record_noshows
+
+
+class NoshowSummaryTestCase(APITestCase):
+    now = datetime.datetime(2023, 6, 1, 12, 0)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = UserFactory(user_type=UserTypeFactory.create_admin_user_type())
+        cls.user_type = UserTypeFactory()
+        cls.user = UserFactory(user_type=cls.user_type)
+        cls.other_user = UserFactory(user_type=cls.user_type)
+        room = RoomFactory()
+
+        def reserve(booker, date, start, is_attended=False):
+            ReservationFactory(booker=booker, room=room, date=date, start=start, end=datetime.time(23), is_attended=is_attended)
+
+        reserve(cls.user, datetime.date(2023, 5, 31), datetime.time(10))
+        reserve(cls.user, datetime.date(2023, 6, 1), datetime.time(11, 50))
+        reserve(cls.other_user, datetime.date(2023, 6, 1), datetime.time(9))
+        reserve(cls.other_user, datetime.date(2023, 6, 1), datetime.time(10), is_attended=True)
+        # 아직 출석 가능한 예약
+        reserve(cls.user, datetime.date(2023, 6, 1), datetime.time(11, 55))
+
+    def test_record_incrementally(self):
+        self.assertEqual(record_noshows(self.now), 3)
+        self.assertEqual(record_noshows(self.now), 0)
+        self.assertEqual(UserNoshowSummary.objects.get(user=self.user).noshow, 2)
+        self.assertEqual(UserNoshowSummary.objects.get(user=self.other_user).noshow, 1)
+
+        self.assertEqual(record_noshows(self.now + datetime.timedelta(minutes=5)), 1)
+        self.assertEqual(UserNoshowSummary.objects.get(user=self.user).noshow, 3)
+        self.assertEqual(UserTypeNoshowSummary.objects.get(user_type=self.user_type).noshow, 4)
+
+    def test_rebuild(self):
+        record_noshows(self.now)
+        UserNoshowSummary.objects.update(noshow=100)
+
+        self.assertEqual(rebuild_noshows(self.now), 3)
+        self.assertEqual(UserNoshowSummary.objects.get(user=self.user).noshow, 2)
+        self.assertEqual(UserTypeNoshowSummary.objects.get(user_type=self.user_type).noshow, 3)
+
+    def __noshows(self):
+        return (
+            dict(UserNoshowSummary.objects.values_list('user_id', 'noshow')),
+            dict(UserTypeNoshowSummary.objects.values_list('user_type_id', 'noshow')),
+        )
+
+    def test_deleting_counted_reservation(self):
+        record_noshows(self.now)
+
+        Reservation.objects.get(booker=self.user, date=datetime.date(2023, 5, 31)).delete()
+        self.assertEqual(self.__noshows(), ({self.user.id: 1, self.other_user.id: 1}, {self.user_type.id: 2}))
+
+        # 아직 집계되지 않은 예약은 집계에 영향이 없다.
+        Reservation.objects.get(booker=self.user, start=datetime.time(11, 55)).delete()
+        self.assertEqual(self.__noshows(), ({self.user.id: 1, self.other_user.id: 1}, {self.user_type.id: 2}))
+
+    def test_correcting_attendance(self):
+        record_noshows(self.now)
+        reservation = Reservation.objects.get(booker=self.user, date=datetime.date(2023, 5, 31))
+
+        reservation.is_attended = True
+        reservation.save()
+        self.assertEqual(self.__noshows(), ({self.user.id: 1, self.other_user.id: 1}, {self.user_type.id: 2}))
+
+        reservation.is_attended = False
+        reservation.save()
+        self.assertEqual(self.__noshows(), ({self.user.id: 2, self.other_user.id: 1}, {self.user_type.id: 3}))
+
+    def test_changing_user_type(self):
+        record_noshows(self.now)
+        new_user_type = UserTypeFactory()
+
+        user = User.objects.get(id=self.user.id)
+        user.user_type = new_user_type
+        user.save()
+        self.assertEqual(self.__noshows()[1], {self.user_type.id: 1, new_user_type.id: 2})
+
+        # 이후 집계는 새 user type에 반영된다.
+        record_noshows(self.now + datetime.timedelta(minutes=5))
+        self.assertEqual(self.__noshows()[1], {self.user_type.id: 1, new_user_type.id: 3})
+
+    def test_command(self):
+        out = StringIO()
+        call_command('record_noshows', '--rebuild', stdout=out)
+
+        self.assertIn('recorded 4 no-shows', out.getvalue())
+
+    def test_admin_endpoints_read_summary(self):
+        self.client.force_authenticate(user=self.admin_user)
+
+        # 조회는 집계를 갱신하지 않는다.
+        response = self.client.get('/api/users/noshow')
+        self.assertListEqual(json.loads(response.content), [])
+        self.assertFalse(Reservation.objects.filter(noshow_recorded=True).exists())
+
+        record_noshows()
+        response = self.client.get('/api/users/noshow')
+        self.assertListEqual(
+            [(row['user_no'], row['noshow']) for row in json.loads(response.content)],
+            [(self.user.user_no, 3), (self.other_user.user_no, 1)],
+        )
+
+        response = self.client.get('/api/users/types/noshow')
+        self.assertListEqual(json.loads(response.content), [{'user_type_name': self.user_type.name, 'noshow': 4}])
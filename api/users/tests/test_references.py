@@ -0,0 +1,63 @@
+import json
+
+from django.core.cache import cache
+
+from rest_framework.test import APITestCase
+
+from .factories import UserFactory, UserTypeFactory
+from ..models import UserDepartment
+from ..references import REFERENCE_VERSION_KEY, user_departments, user_types
+
+
+class ReferenceTableTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = UserFactory(user_type=UserTypeFactory.create_admin_user_type())
+        cls.department = UserDepartment.objects.create(name='컴퓨터공학과')
+
+    def setUp(self):
+        cache.clear()
+        user_types.clear()
+        user_departments.clear()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_user_list_query_count_does_not_depend_on_page_size(self):
+        user_type = UserTypeFactory()
+        UserFactory.create_batch(20, user_type=user_type, department=self.department)
+        self.client.get('/api/users')
+
+        # count, user 목록
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/users')
+
+        user = json.loads(response.content)['results'][-1]
+        self.assertDictEqual(user['user_type'], {'id': user_type.id, 'name': user_type.name, 'possible_duration': 1})
+        self.assertDictEqual(user['department'], {'id': self.department.id, 'name': '컴퓨터공학과'})
+
+    def test_lookup_endpoints_are_cached(self):
+        self.client.get('/api/users/types')
+        self.client.get('/api/users/departments')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/users/departments')
+            response = self.client.get('/api/users/types')
+
+        self.assertEqual(json.loads(response.content)[0]['name'], '조교')
+
+    def test_invalidated_on_save(self):
+        self.client.get('/api/users/departments')
+
+        self.department.name = '전자공학과'
+        self.department.save()
+        response = self.client.get('/api/users/departments')
+
+        self.assertEqual(json.loads(response.content)[0]['name'], '전자공학과')
+
+    def test_invalidated_by_shared_version(self):
+        user_departments.all()
+        # 다른 process에서 변경된 경우
+        UserDepartment.objects.filter(id=self.department.id).update(name='전자공학과')
+        cache.incr(REFERENCE_VERSION_KEY)
+        user_departments.checked_at = 0
+
+        self.assertEqual(user_departments.get(self.department.id).name, '전자공학과')
@@ -1,35 +1,36 @@
-import csv
-import requests
 import json
-from datetime import datetime
+from datetime import timedelta
 
 from django.conf import settings
-from django.http import HttpResponse
 from django.shortcuts import redirect
 from django.contrib.auth import login, authenticate, logout, update_session_auth_hash
+from django.utils import timezone
 from django.utils.crypto import get_random_string
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.db.models import CharField, Value, Count
+from django.db import IntegrityError
 from django.db.models.expressions import F
-from django.db.models.functions import Concat
-from django.db import connection, reset_queries
 
+from rest_framework.authentication import get_authorization_header
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, authentication_classes, permission_classes, action
 from rest_framework.exceptions import NotFound
 from rest_framework.views import APIView
 from rest_framework.viewsets import  ModelViewSet
-from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_409_CONFLICT
 from rest_framework.parsers import MultiPartParser
 
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 
+from common.calendars import token_provider
+from common.mailing import enqueue_mail
+from common.http import google_client
 from common.parsers import PlainTextParser
 from rooms.models import Reservation
-from .models import User, UserType, UserDepartment, GoogleAccount
-from .serializers import LoginSerializer, UserSerializer, UserNoshowSerializer, UserTypeSerializer, UserDepartmentSerializer, PasswordChangeSerializer
+from .authentication import CachedTokenAuthentication, invalidate_token
+from .models import User, GoogleAccount, UserNoshowSummary, UserTypeNoshowSummary
+from .imports import UserCsvImporter
+from .serializers import LoginSerializer, UserSerializer, UserTypeSerializer, UserDepartmentSerializer, PasswordChangeSerializer
+from .references import user_departments, user_types
 from .permissions import IsNonAdminUser, UserAccessPermission, IsAdminUser
 from .documentations import (
     logout_view_operation_description, login_view_operation_description, user_create_operation_description,
@@ -62,6 +63,10 @@ def login_view(request):
 @api_view(['POST'])
 @authentication_classes([])
 def logout_view(request):
+    # 인증 없이 호출되어 request.user로는 token을 알 수 없으므로 요청의 token으로 직접 cache를 비운다.
+    auth = get_authorization_header(request).split()
+    if len(auth) == 2 and auth[0].lower() == CachedTokenAuthentication.keyword.lower().encode():
+        invalidate_token(auth[1].decode(errors='ignore'))
     logout(request)
     return Response()
 
@@ -70,8 +75,7 @@ def logout_view(request):
 @api_view(['GET'])
 @authentication_classes([])
 def get_all_user_type(request):
-    queryset = UserType.objects.all()
-    serializer = UserTypeSerializer(queryset, many=True)
+    serializer = UserTypeSerializer(user_types.all(), many=True)
     return Response(serializer.data)
 
 
@@ -79,8 +83,7 @@ def get_all_user_type(request):
 @api_view(['GET'])
 @authentication_classes([])
 def get_all_user_departments(request):
-    queryset = UserDepartment.objects.all()
-    serializer = UserDepartmentSerializer(queryset, many=True)
+    serializer = UserDepartmentSerializer(user_departments.all(), many=True)
     return Response(serializer.data)
 
 
@@ -135,17 +138,21 @@ def google_callback(request):
     redirect_uri = getattr(settings, 'GOOGLE_REDIRECT_URI')
     authorization_code = request.query_params['code']
 
-    request_uri = ('https://oauth2.googleapis.com/token?'
+    oauth_url = getattr(settings, 'GOOGLE_OAUTH_URL')
+
+    request_uri = (oauth_url + '/token?'
                    'client_id=' + client_id + '&'
                    'client_secret=' + client_secret + '&'
                    'code=' + authorization_code + '&'
                    'grant_type=authorization_code&'
                    'redirect_uri=' + redirect_uri)
-    response = requests.post(request_uri)
+    response = google_client.post(request_uri)
     body_data = response.json()
 
     access_token, refresh_token = body_data['access_token'], body_data['refresh_token']
-    GoogleAccount.objects.create(user_id=state['user_id'], access_token=access_token, refresh_token=refresh_token)
+    access_token_expires_at = timezone.now() + timedelta(seconds=body_data.get('expires_in', 0))
+    GoogleAccount.objects.create(user_id=state['user_id'], access_token=access_token, refresh_token=refresh_token,
+                                 access_token_expires_at=access_token_expires_at)
 
     return Response()
 
@@ -159,11 +166,13 @@ def google_revoke(request):
         return Response('You have not signed up with google account.')
 
     refresh_token = user.google_account.refresh_token
-    uri = f'https://oauth2.googleapis.com/revoke?token={refresh_token}'
+    oauth_url = getattr(settings, 'GOOGLE_OAUTH_URL')
+    uri = f'{oauth_url}/revoke?token={refresh_token}'
 
-    response = requests.post(uri)
+    response = google_client.post(uri)
     if response.status_code == 200:
         user.google_account.delete()
+        token_provider.invalidate(user.id)
         return Response()
     else:
         return Response(response.json(), HTTP_400_BAD_REQUEST)
@@ -173,11 +182,10 @@ def google_revoke(request):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def get_noshow_user_list(request):
-    reset_queries()
-    now = datetime.now().isoformat()
-    results = User.objects.annotate(
-        dt=Concat(F('booker__date'), Value('T'), F('booker__start'), output_field=CharField()), is_attended=F('booker__is_attended')
-    ).filter(dt__lte=now, is_attended=False).annotate(noshow=Count('id'), user_type_name=F('user_type__name')).values('user_no', 'name', 'email', 'user_type_name', 'noshow').order_by('-noshow')
+    # 집계는 record_noshows 명령이 주기적으로 갱신하고, 조회는 집계 테이블만 읽는다.
+    results = UserNoshowSummary.objects.filter(noshow__gt=0).annotate(
+        user_no=F('user__user_no'), name=F('user__name'), email=F('user__email'), user_type_name=F('user__user_type__name')
+    ).values('user_no', 'name', 'email', 'user_type_name', 'noshow').order_by('-noshow')
 
     return Response(results)
 
@@ -186,10 +194,9 @@ def get_noshow_user_list(request):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def get_user_type_noshow_count(request):
-    now = datetime.now().isoformat()
-    results = User.objects.annotate(
-        dt=Concat(F('booker__date'), Value('T'), F('booker__start'), output_field=CharField()), is_attended=F('booker__is_attended')
-    ).filter(dt__lte=now, is_attended=False).annotate(user_type_name=F('user_type__name')).values('user_type_name').annotate(noshow=Count('user_type_name')).order_by('-noshow')
+    results = UserTypeNoshowSummary.objects.filter(noshow__gt=0).annotate(
+        user_type_name=F('user_type__name')
+    ).values('user_type_name', 'noshow').order_by('-noshow')
 
     return Response(results)
 
@@ -197,11 +204,12 @@ def get_user_type_noshow_count(request):
 class UserViewSet(ModelViewSet):
     __normal_user_patchable_fields = ('name', 'email')
     lookup_value_regex = r'[0-9]+'
-    queryset = User.objects.all().order_by('user_type', 'user_no')
+    queryset = User.objects.all().order_by('user_type_id', 'user_no')
     serializer_class = UserSerializer
     permission_classes = [UserAccessPermission]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['user_no']
+    cursor_ordering = ('user_type_id', 'user_no')
 
     def get_object(self):
         if self.request.user.is_admin():
@@ -213,13 +221,14 @@ class UserViewSet(ModelViewSet):
             return set(self.request.data).difference(self.__normal_user_patchable_fields)
         return False
 
-    def __send_initial_password_email(self, password, to_email):
-        send_mail(
+    def __send_initial_password_email(self, user):
+        enqueue_mail(
             '초기 비밀번호를 안내드립니다.',
-            f'비밀번호  {password}',
-            from_email=None,
-            recipient_list=[to_email],
-            html_message=render_to_string('mailing/initial_password.html', context={'password': password})
+            [user.email],
+            template_name='mailing/initial_password.html',
+            context={'user_id': user.id},
+            message='비밀번호  {{ password }}',
+            context_loader='users.passwords.issue_initial_password',
         )
 
     @swagger_auto_schema(responses={200: UserResponse, 404: not_found_response}, operation_description='id에 해당하는 유저 정보 조회')
@@ -240,7 +249,7 @@ class UserViewSet(ModelViewSet):
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
-        # self.__send_initial_password_email(data['password'], data['email'])
+        # self.__send_initial_password_email(serializer.instance)
 
         return Response(serializer.data, status=HTTP_201_CREATED)
 
@@ -265,74 +274,18 @@ class UserViewSet(ModelViewSet):
 class UserCsvCreateView(APIView):
     parser_classes = [MultiPartParser, PlainTextParser]
 
-    def validate(self, rdr, user_no_list):
-        error_occured = False
-
-        lines = []
-        validated_data_lst = []
-        for line in rdr:
-            if user_no_list.count(line['user_no']) > 1:
-                line['user_no_duplicated'] = True
-                error_occured = True
-            else:
-                line['user_no_duplicated'] = ''
-
-            serializer = UserSerializer(data=line)
-            if serializer.is_valid():
-                validated_data_lst.append(serializer.validated_data)
-            else:
-                line['errors'] = serializer.errors
-                error_occured = True
-
-            lines.append(line)
-
-        return error_occured, lines, validated_data_lst
-
-    def get_response(self):
-        response = HttpResponse(content_type='text/csv')
-        response.write(u'\ufeff'.encode('utf8'))
-        return response
-
-    def write_csv(self, response, fieldnames, ko_header, lines):
-        writer = csv.DictWriter(response, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerow(ko_header)
-        writer.writerows(lines)
-
-    @swagger_auto_schema(responses={200: '결과 데이터 csv', 400: '파일 key 이름 확인(user_input)'}, operation_description=user_bulk_create_operation_description)
+    @swagger_auto_schema(responses={200: '결과 데이터 json', 400: '파일 key 이름 확인(user_input) 또는 결과 데이터 json', 409: '같은 user_no가 동시에 생성됨'}, operation_description=user_bulk_create_operation_description)
     def post(self, request, *args, **kwargs):
         if 'user_input' not in request.FILES:
             return Response("File key error(user_input).", HTTP_400_BAD_REQUEST)
 
-        file = request.FILES['user_input']
-        decoded_file = file.read().decode('euc-kr').splitlines()
-    
-        rdr = csv.reader(decoded_file)
-        user_no_list = [line[0] for line in list(rdr)[2:]]
-
-        file.seek(0)
-        dict_rdr = csv.DictReader(decoded_file)
-        ko_header = next(dict_rdr)
-        error_occured, lines, validated_data_lst = self.validate(dict_rdr, user_no_list)
-
-        ko_header['user_no_duplicated'], ko_header['errors'] = '학번/직번 중복', '데이터 형식 에러'
-        lines.insert(0, ko_header)
-
-        # response = self.get_response()
-        # fieldnames = dict_rdr.fieldnames + ['user_no_duplicated', 'errors']
-        # self.write_csv(response, fieldnames, ko_header, lines)
-
-        if not error_occured:
-            User.objects.bulk_create(
-                [User.objects.get_user_instance(**data) for data in validated_data_lst]
-            )
-
-        # return response
-        return Response({
-            'error_occured': error_occured,
-            'results': lines,
-            })
-    
+        importer = UserCsvImporter(request.FILES['user_input'].file)
+        try:
+            created = importer.run()
+        except IntegrityError:
+            return Response({'message': 'user_no가 동시에 생성되었습니다. 다시 시도해 주세요.'}, HTTP_409_CONFLICT)
+        return Response(importer.get_report(), status=HTTP_200_OK if created else HTTP_400_BAD_REQUEST)
+
     @swagger_auto_schema(responses={200: '0: 삭제된 user의 숫자'}, operation_description=user_bulk_delete_operation_description)
     def delete(self, request, *args, **kwargs):
         data_to_str = request.data.decode('utf-8')
@@ -0,0 +1,261 @@
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, time as Time, timedelta
+
+import numpy as np
+import requests
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from common.fakes import FakeGoogleServer
+from rooms.models import GoogleCalenderLog, Reservation, Room, get_period
+from rooms.recurrences import WEEKDAYS, get_schedule_weekday_mask
+from users.models import User, UserDepartment, UserType
+
+
+BENCHMARK_USER_PREFIX = "B"
+BENCHMARK_ROOM_PREFIX = "벤치마크 회의실"
+BENCHMARK_PASSWORD = "benchmark-password"
+ADMIN_USER_NO = f"{BENCHMARK_USER_PREFIX}admin"
+USER_TYPES = ((1, "조교", 0), (2, "교수", 4), (3, "대학원생", 3), (4, "학부생", 2))
+SEMESTER_START = date(2023, 3, 2)
+BATCH_SIZE = 1000
+
+
+def reset_dataset():
+    with transaction.atomic():
+        User.objects.filter(user_no__startswith=BENCHMARK_USER_PREFIX).delete()
+        Room.objects.filter(name__startswith=BENCHMARK_ROOM_PREFIX).delete()
+
+
+def seed_dataset(users=3000, rooms=30, weeks=16, seed=0, start=SEMESTER_START):
+    """
+    부하 테스트용 데이터 생성
+    학기(weeks주) 동안의 단일 예약, 반복 예약, 동반 참석자, 구글 캘린더 기록을 회의실마다 만든다.
+    """
+    rng = random.Random(seed)
+    with transaction.atomic():
+        for id, name, possible_duration in USER_TYPES:
+            UserType.objects.get_or_create(id=id, defaults={"name": name, "possible_duration": possible_duration})
+        departments = [UserDepartment.objects.get_or_create(name=f"학과{i}")[0] for i in range(10)]
+
+        # 모든 user가 같은 비밀번호를 쓰므로 hash는 한 번만 계산
+        password = make_password(BENCHMARK_PASSWORD)
+        user_rows = [User(user_no=ADMIN_USER_NO, name="관리자", email="admin@example.com", user_type_id=1, password=password)]
+        user_rows += [
+            User(
+                user_no=f"{BENCHMARK_USER_PREFIX}{i:07d}",
+                name=f"사용자{i}",
+                email=f"user{i}@example.com",
+                user_type_id=rng.choice((2, 3, 4, 4, 4)),
+                department=rng.choice(departments),
+                password=password,
+            )
+            for i in range(users)
+        ]
+        User.objects.bulk_create(user_rows, batch_size=BATCH_SIZE)
+        user_ids = list(
+            User.objects.filter(user_no__startswith=BENCHMARK_USER_PREFIX).order_by("id").values_list("id", flat=True)
+        )
+        Token.objects.bulk_create([Token(key=Token.generate_key(), user_id=id) for id in user_ids], batch_size=BATCH_SIZE)
+
+        Room.objects.bulk_create(
+            [Room(name=f"{BENCHMARK_ROOM_PREFIX}{i}", discription="부하 테스트용 회의실") for i in range(rooms)]
+        )
+        room_ids = list(Room.objects.filter(name__startswith=BENCHMARK_ROOM_PREFIX).values_list("id", flat=True))
+
+        reservations = []
+        today = date.today()
+        days = [start + timedelta(days=i) for i in range(weeks * 7) if (start + timedelta(days=i)).weekday() < 5]
+        for room_id in room_ids:
+            # 매주 반복되는 정기 회의 (18시 이후)
+            for hour in rng.sample(range(18, 22), 2):
+                day = rng.sample(WEEKDAYS[:5], rng.randint(1, 2))
+                reservations.append(
+                    Reservation(
+                        room_id=room_id, booker_id=rng.choice(user_ids), is_scheduled=True, day=day,
+                        weekday_mask=get_schedule_weekday_mask(day, start), date=start,
+                        schedule_daedline=start + timedelta(weeks=weeks), start=Time(hour), end=Time(hour, 50),
+                        reason="정기 회의",
+                    )
+                )
+            # 평일 9 ~ 18시 단일 예약
+            for day in days:
+                for hour in rng.sample(range(9, 18), rng.randint(1, 5)):
+                    reservations.append(
+                        Reservation(
+                            room_id=room_id, booker_id=rng.choice(user_ids), date=day, start=Time(hour),
+                            end=Time(hour, 50), reason="회의", is_attended=day < today and rng.random() < 0.8,
+                        )
+                    )
+        for reservation in reservations:
+            reservation.starts_at, reservation.ends_at = get_period(reservation.date, reservation.start, reservation.end)
+        Reservation.objects.bulk_create(reservations, batch_size=BATCH_SIZE)
+
+        reservation_rows = list(
+            Reservation.objects.filter(room_id__in=room_ids).values_list("id", "booker_id")
+        )
+        Companion = Reservation.companion.through
+        Companion.objects.bulk_create(
+            [
+                Companion(reservation_id=reservation_id, user_id=user_id)
+                for reservation_id, _ in reservation_rows
+                for user_id in rng.sample(user_ids, rng.randint(0, 3))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        GoogleCalenderLog.objects.bulk_create(
+            [
+                GoogleCalenderLog(owner_id=booker_id, event_id=uuid.uuid4().hex, reservation_id=reservation_id)
+                for reservation_id, booker_id in reservation_rows
+                if rng.random() < 0.5
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    return {"users": len(user_ids), "rooms": len(room_ids), "reservations": len(reservation_rows)}
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def local_server():
+    """구글 API 대신 FakeGoogleServer를 사용하는 API 서버를 현재 process에서 실행"""
+    with FakeGoogleServer() as fake_google:
+        overrides = {**fake_google.settings, "EMAIL_BACKEND": "django.core.mail.backends.locmem.EmailBackend"}
+        with override_settings(**overrides):
+            server = ThreadedWSGIServer(("127.0.0.1", 0), QuietRequestHandler, allow_reuse_address=False)
+            server.set_app(WSGIHandler())
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                host, port = server.server_address[:2]
+                yield f"http://{host}:{port}"
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+class Scenarios:
+    """부하 테스트할 endpoint별 요청 생성"""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        tokens = dict(
+            Token.objects.filter(user__user_no__startswith=BENCHMARK_USER_PREFIX).values_list("user__user_no", "key")
+        )
+        if ADMIN_USER_NO not in tokens:
+            raise ValueError("seed_benchmark로 데이터를 먼저 생성해야 합니다.")
+        self.admin_token = tokens.pop(ADMIN_USER_NO)
+        self.users = list(
+            User.objects.filter(user_no__in=tokens).values_list("id", "user_no")
+        )
+        self.tokens = tokens
+        self.room_ids = list(Room.objects.filter(name__startswith=BENCHMARK_ROOM_PREFIX).values_list("id", flat=True))
+        self.next_day = date.today() + timedelta(days=365)
+
+    def __user(self):
+        with self.lock:
+            id, user_no = self.rng.choice(self.users)
+        return id, self.tokens[user_no]
+
+    def reservation_create(self):
+        booker_id, token = self.__user()
+        with self.lock:
+            # 다른 요청과 겹치지 않도록 요청마다 다른 날짜
+            self.next_day += timedelta(days=1)
+            day, room_id = self.next_day, self.rng.choice(self.room_ids)
+        data = {
+            "booker": booker_id, "room": room_id, "date": day.isoformat(),
+            "start": "10:00:00", "end": "11:00:00", "reason": "부하 테스트",
+        }
+        return "POST", "/api/rooms/reservations", token, {"json": data}
+
+    def reservation_list(self):
+        _, token = self.__user()
+        with self.lock:
+            day = SEMESTER_START + timedelta(days=self.rng.randrange(7 * 16))
+        return "GET", "/api/rooms/reservations", token, {"params": {"date": day.isoformat()}}
+
+    def my_reservations(self):
+        booker_id, token = self.__user()
+        return "GET", "/api/rooms/my-reservations", token, {"params": {"booker": booker_id}}
+
+    def users_list(self):
+        return "GET", "/api/users", self.admin_token, {"params": {"cursor": ""}}
+
+    def noshow(self):
+        return "GET", "/api/users/noshow", self.admin_token, {}
+
+    def rooms_list(self):
+        _, token = self.__user()
+        return "GET", "/api/rooms", token, {}
+
+    ENDPOINTS = ("reservation_create", "reservation_list", "my_reservations", "users_list", "noshow", "rooms_list")
+
+
+def summarize(latencies, statuses, elapsed):
+    latencies_ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if not 200 <= status < 300),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "mean_ms": round(float(latencies_ms.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+    }
+
+
+def run_endpoint(base_url, make_request, requests_count, concurrency):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def send(_):
+        method, path, token, kwargs = make_request()
+        started_at = time.perf_counter()
+        response = session.request(method, base_url + path, headers={"Authorization": f"Token {token}"}, **kwargs)
+        return time.perf_counter() - started_at, response.status_code
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(requests_count)))
+    elapsed = time.perf_counter() - started_at
+
+    return summarize([latency for latency, _ in results], Counter(status for _, status in results), elapsed)
+
+
+def run_load(base_url, endpoints=Scenarios.ENDPOINTS, requests_count=200, concurrency=8, seed=0):
+    scenarios = Scenarios(seed)
+    return {
+        endpoint: run_endpoint(base_url, getattr(scenarios, endpoint), requests_count, concurrency)
+        for endpoint in endpoints
+    }
+
+
+def compare(results, baseline):
+    """endpoint별 p50, p95, p99, 처리량의 baseline 대비 비율"""
+    return {
+        endpoint: {
+            key: round(result[key] / baseline[endpoint][key], 2) if baseline[endpoint][key] else None
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        }
+        for endpoint, result in results.items()
+        if endpoint in baseline
+    }
@@ -0,0 +1,63 @@
+import json
+import subprocess
+from contextlib import nullcontext
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.benchmarks import Scenarios, compare, local_server, run_load
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "seed_benchmark로 만든 데이터로 주요 endpoint에 동시 요청을 보내 지연 시간과 처리량을 JSON으로 출력"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", default=None, help="요청을 보낼 서버 주소, 생략하면 가짜 구글 서버와 함께 현재 process에서 실행"
+        )
+        parser.add_argument("--requests", type=int, default=200, help="endpoint마다 보낼 요청 수")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--endpoints", default=",".join(Scenarios.ENDPOINTS), help="쉼표로 구분한 endpoint 이름"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일")
+        parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON 파일")
+
+    def handle(self, *args, **options):
+        endpoints = [endpoint for endpoint in options["endpoints"].split(",") if endpoint]
+        unknown = set(endpoints) - set(Scenarios.ENDPOINTS)
+        if unknown:
+            raise CommandError(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+        server = nullcontext(options["url"]) if options["url"] else local_server()
+        with server as base_url:
+            try:
+                results = run_load(base_url, endpoints, options["requests"], options["concurrency"], options["seed"])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        report = {
+            "commit": get_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "config": {"requests": options["requests"], "concurrency": options["concurrency"]},
+            "endpoints": results,
+        }
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                report["compared_to"] = compare(results, json.load(f)["endpoints"])
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
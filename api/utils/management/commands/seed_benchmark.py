@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from utils.benchmarks import reset_dataset, seed_dataset
+
+
+class Command(BaseCommand):
+    help = "부하 테스트용 user, 회의실, 한 학기 분량의 예약 데이터 생성"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=3000)
+        parser.add_argument("--rooms", type=int, default=30)
+        parser.add_argument("--weeks", type=int, default=16, help="예약을 생성할 기간(주)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--reset", action="store_true", help="이전에 생성한 부하 테스트 데이터를 지우고 다시 생성"
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            reset_dataset()
+        summary = seed_dataset(options["users"], options["rooms"], options["weeks"], options["seed"])
+        self.stdout.write(
+            f"created {summary['users']} users, {summary['rooms']} rooms, {summary['reservations']} reservations"
+        )
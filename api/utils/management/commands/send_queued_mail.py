@@ -0,0 +1,13 @@
+from common.mailing import SENT, send_pending_mails
+from common.outbox import OutboxWorkerCommand
+
+
+class Command(OutboxWorkerCommand):
+    help = "메일 발송 대기열을 SMTP 연결 하나로 일괄 발송"
+
+    def process(self, options):
+        return send_pending_mails(options["batch_size"])
+
+    def report(self, mails):
+        sent = sum(mail.status == SENT for mail in mails)
+        return f"processed {len(mails)} mails ({sent} sent)"
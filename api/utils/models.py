@@ -1,4 +1,5 @@
 import datetime
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 from users.models import User
@@ -34,3 +35,32 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now=True)
     content = models.CharField(max_length=300)
     report = models.ForeignKey(Report, related_name="comment", on_delete=models.CASCADE)
+
+
+class QueuedEmail(models.Model):
+    STATUS_CHOICE = (
+        (0, "pending"),
+        (1, "sent"),
+        (2, "failed"),
+    )
+    id = models.BigAutoField(primary_key=True)
+    subject = models.CharField(max_length=255)
+    # 본문은 발송 시점에 렌더링하고, 비밀번호 등 비밀 값은 저장하지 않고 context_loader가 발송 시점에 만든다.
+    message = models.TextField(blank=True, default="")
+    template_name = models.CharField(max_length=255, blank=True, default="")
+    context = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    context_loader = models.CharField(max_length=255, blank=True, default="")
+    from_email = models.CharField(max_length=255, null=True, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.IntegerField(choices=STATUS_CHOICE, default=0)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=datetime.datetime.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="queued_email_pending_idx"
+            ),
+        ]
@@ -1,3 +1,126 @@
-from django.test import TestCase
+from collections import Counter
+from datetime import datetime
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from rest_framework.authtoken.models import Token
+
+from common.mailing import FAILED, enqueue_mail, send_pending_mails
+from common.outbox import PENDING
+from rooms.models import GoogleCalenderLog, Reservation
+from users.tests.factories import UserFactory
+from .benchmarks import Scenarios, compare, reset_dataset, seed_dataset, summarize
+from .models import QueuedEmail
+
+
+class EmailQueueTestCase(TestCase):
+    def test_enqueue_does_not_send(self):
+        queued = enqueue_mail('subject', ['user@example.com'], template_name='mailing/reservation.html', context={'room_name': '회의실'})
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(queued.status, PENDING)
+
+        send_pending_mails()
+
+        # 본문은 발송 시점에 렌더링하고, 발송한 메일은 지운다.
+        self.assertIn('회의실', mail.outbox[0].alternatives[0][0])
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_password_is_not_queued(self):
+        user = UserFactory()
+        queued = enqueue_mail(
+            '초기 비밀번호를 안내드립니다.',
+            [user.email],
+            template_name='mailing/initial_password.html',
+            context={'user_id': user.id},
+            message='비밀번호  {{ password }}',
+            context_loader='users.passwords.issue_initial_password',
+        )
+        self.assertDictEqual(QueuedEmail.objects.get(id=queued.id).context, {'user_id': user.id})
+
+        send_pending_mails()
+
+        # 비밀번호는 발송할 때 발급된다.
+        password = mail.outbox[0].body.split()[-1]
+        self.assertIn(password, mail.outbox[0].alternatives[0][0])
+        user.refresh_from_db()
+        self.assertTrue(user.check_password(password))
+
+    def test_batch_is_sent_over_single_connection(self):
+        for i in range(3):
+            enqueue_mail('subject', [f'user{i}@example.com'], template_name='mailing/initial_password.html', context={'password': i})
+
+        with mock.patch('common.mailing.get_connection', wraps=get_connection) as connection_factory:
+            send_pending_mails()
+
+        connection_factory.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    @override_settings(EMAIL_QUEUE_MAX_ATTEMPTS=2)
+    def test_failed_mail_is_retried(self):
+        queued = enqueue_mail('subject', ['user@example.com'], message='message')
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=SMTPException('down')):
+            send_pending_mails()
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, PENDING)
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.next_attempt_at, datetime.now())
+        self.assertIn('down', queued.last_error)
+
+        QueuedEmail.objects.update(next_attempt_at=datetime.now())
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=SMTPException('down')):
+            send_pending_mails()
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, FAILED)
+        self.assertEqual(queued.message, '')
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_queued_mail_command(self):
+        enqueue_mail('subject', ['user@example.com'], message='message')
+        out = StringIO()
+
+        call_command('send_queued_mail', '--once', stdout=out)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('processed 1 mails (1 sent)', out.getvalue())
+
+
+class BenchmarkTestCase(TestCase):
+    def test_seed_dataset(self):
+        summary = seed_dataset(users=20, rooms=2, weeks=2)
+
+        self.assertEqual(summary['users'], 21)
+        self.assertEqual(Token.objects.count(), 21)
+        self.assertEqual(Reservation.objects.filter(is_scheduled=True).count(), 4)
+        self.assertFalse(Reservation.objects.filter(is_scheduled=True, weekday_mask=0).exists())
+        self.assertTrue(GoogleCalenderLog.objects.exists())
+
+        reset_dataset()
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_scenarios_require_seeded_dataset(self):
+        with self.assertRaises(ValueError):
+            Scenarios()
+
+    def test_summarize(self):
+        summary = summarize([i / 1000 for i in range(1, 101)], Counter({200: 99, 500: 1}), elapsed=2)
+
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['p50_ms'], 50.5)
+        self.assertEqual(summary['p99_ms'], 99.01)
+        self.assertEqual(summary['throughput_rps'], 50)
+        self.assertDictEqual(
+            compare({'noshow': summary}, {'noshow': {**summary, 'p95_ms': summary['p95_ms'] / 2}})['noshow'],
+            {'p50_ms': 1.0, 'p95_ms': 2.0, 'p99_ms': 1.0, 'throughput_rps': 1.0},
+        )
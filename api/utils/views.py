@@ -26,6 +26,7 @@ class ReportView(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = ReportSerializer
     queryset = Report.objects.all()
+    cursor_ordering = ("id",)
 
 
 class CommentView(viewsets.ModelViewSet):